@@ -0,0 +1,208 @@
+"""
+End-to-end load benchmark: the real main.main() run against local stub servers.
+
+    python -m scrapper.benchmarks.load [--rows 2000] [--latency-ms 150] [--error-rate 0.02]
+                                       [--json report.json] [--baseline previous.json]
+
+Instagram and TikTok pages come from recorded HTML served locally (the
+browser tiers still need Chromium: `playwright install chromium`), YouTube
+goes through the Data API client pointed at the same server, and the Google
+Sheet is an in-memory worksheet with its own per-call latency.
+"""
+import argparse
+import asyncio
+import copy
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+from collections import Counter
+from . import stub_servers
+from .. import main as scraper_main
+
+DEFAULT_MIX = 'instagram=0.4,tiktok=0.3,youtube=0.3'
+
+
+def parse_mix(text: str) -> dict:
+    mix = {}
+    for part in text.split(','):
+        platform, _, weight = part.partition('=')
+        mix[platform.strip()] = float(weight or 1)
+    return mix
+
+
+def video_url(platform: str, n: int) -> str:
+    if platform == 'instagram':
+        return f"https://www.instagram.com/reel/Bench{n:07d}/"
+    if platform == 'tiktok':
+        return f"https://www.tiktok.com/@bench/video/{7300000000000000000 + n}"
+    return f"https://www.youtube.com/watch?v=b{n:010d}"
+
+
+def build_rows(count: int, mix: dict, duplicates: float, seed: int = 7) -> list:
+    """Sheet URLs in the given platform mix; a `duplicates` fraction repeats an earlier row's video."""
+    rng = random.Random(seed)
+    platforms, weights = zip(*mix.items())
+    urls = []
+    for n in range(count):
+        if urls and rng.random() < duplicates:
+            urls.append(rng.choice(urls))
+        else:
+            urls.append(video_url(rng.choices(platforms, weights)[0], n))
+    return urls
+
+
+def build_config(base: dict, workdir: str, origin: str, args) -> dict:
+    """settings.json pointed at the stubs, with caching and pacing out of the way."""
+    config = copy.deepcopy(base)
+    ops = config['scraping_options']
+    ops['headless'] = True
+    ops['user_data_dir'] = os.path.join(workdir, 'browser_context')
+    ops['cookies_file'] = os.path.join(workdir, 'cookies.json')
+    ops['journal_path'] = os.path.join(workdir, 'run_journal.jsonl')
+    for section in ('cache', 'history', 'incremental'):
+        ops.setdefault(section, {})['enabled'] = False
+    ops['debug_capture'] = {'enabled': False}
+    ops['metrics'] = {'enabled': True, 'report_path': os.path.join(workdir, 'run_report.json'), 'prometheus_path': ''}
+    # Pace at a fixed rate so the limiter measures the same thing every run
+    ops['rate_limit'] = {'default': {'initial_rate': args.rate, 'min_rate': args.rate, 'max_rate': args.rate}}
+    ops.setdefault('retry', {}).update(base_delay_seconds=0.5, max_delay_seconds=2)
+    for retry_class in ops['retry'].get('classes', {}).values():
+        retry_class['base_delay_seconds'] = 0.5
+    if args.concurrency:
+        ops['concurrency'] = {**ops.get('concurrency', {}), **{k: int(v) for k, v in parse_mix(args.concurrency).items()}}
+
+    platforms = config.setdefault('platforms', {})
+    for platform in ('instagram', 'tiktok'):
+        platforms.setdefault(platform, {})['origin'] = origin
+    youtube = platforms.setdefault('youtube', {})
+    youtube['api'] = {**youtube.get('api', {}), 'enabled': True, 'api_key': 'stub',
+                      'api_endpoint': origin + '/', 'daily_quota': 10 ** 9}
+
+    config['logging'] = {'level': args.log_level, 'file': os.path.join(workdir, 'scraper.log')}
+    return config
+
+
+def percentile(values: list, q: float) -> float:
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def run(args) -> dict:
+    base = scraper_main.load_config(args.config)
+    urls = build_rows(args.rows, parse_mix(args.mix), args.duplicates)
+    headers = list(base['google_sheets']['columns'].values())
+    url_header = base['google_sheets']['columns']['url']
+    status_col = headers.index(base['google_sheets']['columns']['status']) + 1
+
+    server = stub_servers.StubPlatformServer(args.latency_ms / 1000, args.jitter_ms / 1000, args.error_rate).start()
+    worksheet = stub_servers.StubWorksheet(headers, [{url_header: url} for url in urls], args.sheets_latency_ms / 1000)
+    finished_at = {}
+    original_client = scraper_main.GoogleSheetClient
+    scraper_main.GoogleSheetClient = stub_servers.stub_sheet_client(worksheet, finished_at)
+    try:
+        with tempfile.TemporaryDirectory(prefix='scraper-bench-') as workdir:
+            config_path = os.path.join(workdir, 'settings.json')
+            with open(config_path, 'w') as f:
+                json.dump(build_config(base, workdir, server.origin, args), f)
+
+            started = time.perf_counter()
+            asyncio.run(scraper_main.main(scraper_main.parse_args(['--full', '--config', config_path])))
+            elapsed = time.perf_counter() - started
+
+            report_path = os.path.join(workdir, 'run_report.json')
+            stages = {}
+            if os.path.exists(report_path):
+                with open(report_path) as f:
+                    stages = json.load(f).get('stages', {})
+    finally:
+        scraper_main.GoogleSheetClient = original_client
+        server.stop()
+
+    latencies = sorted(finished_at[row] - worksheet.read_at[row] for row in finished_at if row in worksheet.read_at)
+    statuses = Counter(str(worksheet.cells.get((row, status_col), '')).split(':')[0] or 'MISSING'
+                       for row in range(2, len(urls) + 2))
+    # ru_maxrss is in kilobytes on Linux, bytes on macOS
+    rss_unit = 1 if sys.platform == 'darwin' else 1024
+    return {
+        'rows': len(urls),
+        'unique_videos': len(set(urls)),
+        'elapsed_seconds': round(elapsed, 2),
+        'rows_per_second': round(len(urls) / elapsed, 2),
+        'row_latency_seconds': {
+            'p50': round(percentile(latencies, 0.5), 3),
+            'p99': round(percentile(latencies, 0.99), 3),
+            'max': round(latencies[-1], 3) if latencies else 0.0,
+        },
+        'statuses': dict(statuses),
+        'sheets_api_calls': dict(worksheet.calls),
+        'sheet_cells_written': worksheet.cells_written,
+        'platform_requests': dict(server.requests),
+        'injected_errors': dict(server.errors),
+        'peak_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * rss_unit / 2 ** 20, 1),
+        # Largest child process that has exited and been waited for, e.g. the Playwright driver
+        'peak_child_rss_mb': round(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * rss_unit / 2 ** 20, 1),
+        'stages': stages,
+        'settings': {key: getattr(args, key) for key in
+                     ('rows', 'mix', 'duplicates', 'latency_ms', 'jitter_ms', 'error_rate', 'sheets_latency_ms', 'rate')},
+    }
+
+
+def compare(report: dict, baseline: dict, tolerance: float) -> list:
+    """Regressions against an earlier report: throughput down or p99 latency up by more than tolerance."""
+    problems = []
+    if report['rows_per_second'] < baseline['rows_per_second'] * (1 - tolerance):
+        problems.append(f"rows/sec {report['rows_per_second']} vs baseline {baseline['rows_per_second']}")
+    p99, base_p99 = report['row_latency_seconds']['p99'], baseline['row_latency_seconds']['p99']
+    if base_p99 and p99 > base_p99 * (1 + tolerance):
+        problems.append(f"p99 row latency {p99}s vs baseline {base_p99}s")
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=2000)
+    parser.add_argument('--mix', default=DEFAULT_MIX, help="platform weights, e.g. 'youtube=1' for a browserless run")
+    parser.add_argument('--duplicates', type=float, default=0.05, help="fraction of rows repeating an earlier video")
+    parser.add_argument('--latency-ms', type=float, default=150, help="stub page/API response time")
+    parser.add_argument('--jitter-ms', type=float, default=50)
+    parser.add_argument('--error-rate', type=float, default=0.02, help="fraction of Instagram/TikTok pages that fail")
+    parser.add_argument('--sheets-latency-ms', type=float, default=200, help="time per stub Sheets API call")
+    parser.add_argument('--rate', type=float, default=50, help="requests/second allowed per platform")
+    parser.add_argument('--concurrency', default='', help="override scraping_options.concurrency, e.g. 'instagram=4'")
+    parser.add_argument('--config', default=scraper_main.DEFAULT_CONFIG, help="settings file to start from")
+    parser.add_argument('--log-level', default='CRITICAL', help="log level for the run; injected failures log at ERROR")
+    parser.add_argument('--json', metavar='PATH', help="also write the report here")
+    parser.add_argument('--baseline', metavar='PATH', help="earlier --json report to check for regressions")
+    parser.add_argument('--tolerance', type=float, default=0.1, help="allowed slowdown against --baseline")
+    args = parser.parse_args(argv)
+
+    report = run(args)
+    latency = report['row_latency_seconds']
+    print(f"{report['rows']:,} rows ({report['unique_videos']:,} unique videos) in {report['elapsed_seconds']}s: "
+          f"{report['rows_per_second']} rows/sec")
+    print(f"Row latency (read to result): p50 {latency['p50']}s  p99 {latency['p99']}s  max {latency['max']}s")
+    print(f"Statuses: {report['statuses']}")
+    print(f"Sheets API calls: {report['sheets_api_calls']} ({report['sheet_cells_written']:,} cells written)")
+    print(f"Platform requests: {report['platform_requests']}  injected errors: {report['injected_errors']}")
+    print(f"Peak RSS: {report['peak_rss_mb']} MB (largest child process {report['peak_child_rss_mb']} MB)")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            problems = compare(report, json.load(f), args.tolerance)
+        for problem in problems:
+            print(f"REGRESSION: {problem}")
+        if problems:
+            sys.exit(1)
+        print(f"No regression against {args.baseline} (tolerance {args.tolerance:.0%})")
+
+
+if __name__ == '__main__':
+    main()
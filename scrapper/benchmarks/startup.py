@@ -0,0 +1,105 @@
+"""
+Startup benchmark: how long a fresh process takes to start doing useful work.
+
+    python -m scrapper.benchmarks.startup [--runs 5] [--mix youtube=1]
+
+Each run is a new interpreter that imports scrapper.main and runs it against
+the load benchmark's stubs. Reported per run: the import time, the time until
+the first page of rows has been read, and the time until the first platform
+request, plus which heavy third-party modules were loaded along the way.
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Imports that dominate a cold start when loaded eagerly
+HEAVY_MODULES = ('playwright', 'yt_dlp', 'gspread', 'google.oauth2', 'googleapiclient', 'httpx', 'nest_asyncio')
+
+
+def loaded_modules() -> list:
+    return [name for name in HEAVY_MODULES if name in sys.modules]
+
+
+def child(args) -> dict:
+    """One measured run in this (fresh) process."""
+    started = time.perf_counter()
+    from .. import main as scraper_main
+    imported = time.perf_counter()
+    at_import = loaded_modules()
+
+    # Harness setup is timed and taken out of the figures below
+    from . import load, stub_servers
+    base = scraper_main.load_config(args.config)
+    columns = base['google_sheets']['columns']
+    urls = load.build_rows(args.rows, load.parse_mix(args.mix), 0)
+    server = stub_servers.StubPlatformServer(args.latency_ms / 1000, 0, 0).start()
+    worksheet = stub_servers.StubWorksheet(list(columns.values()), [{columns['url']: url} for url in urls],
+                                           args.sheets_latency_ms / 1000)
+    scraper_main.GoogleSheetClient = stub_servers.stub_sheet_client(worksheet, {})
+    with tempfile.TemporaryDirectory(prefix='scraper-startup-') as workdir:
+        config_path = os.path.join(workdir, 'settings.json')
+        with open(config_path, 'w') as f:
+            json.dump(load.build_config(base, workdir, server.origin, args), f)
+        harness = time.perf_counter() - imported
+
+        asyncio.run(scraper_main.main(scraper_main.parse_args(['--full', '--config', config_path])))
+    server.stop()
+
+    def since_start(at):
+        return round(at - started - harness, 3) if at else None
+
+    return {
+        'import_seconds': round(imported - started, 3),
+        'first_page_read_seconds': since_start(min(worksheet.read_at.values(), default=None)),
+        'first_platform_request_seconds': since_start(server.first_request_at),
+        'modules_at_import': at_import,
+        'modules_loaded': loaded_modules(),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--rows', type=int, default=50)
+    parser.add_argument('--mix', default='youtube=1', help="platform weights; browser platforms add a Chromium launch")
+    parser.add_argument('--latency-ms', type=float, default=50, help="stub page/API response time")
+    parser.add_argument('--sheets-latency-ms', type=float, default=100, help="time per stub Sheets API call")
+    parser.add_argument('--rate', type=float, default=50, help="requests/second allowed per platform")
+    parser.add_argument('--concurrency', default='')
+    parser.add_argument('--config', default=os.path.join(PROJECT_ROOT, 'config', 'settings.json'))
+    parser.add_argument('--log-level', default='CRITICAL')
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        print(json.dumps(child(args)))
+        return
+
+    passthrough = [arg for arg in (argv if argv is not None else sys.argv[1:]) if arg != '--child']
+    results = []
+    for _ in range(args.runs):
+        output = subprocess.run([sys.executable, '-m', 'scrapper.benchmarks.startup', '--child', *passthrough],
+                                cwd=PROJECT_ROOT, capture_output=True, text=True, check=True).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+
+    print(f"Cold start over {args.runs} runs (median / max):")
+    for key, label in (('import_seconds', 'import scrapper.main'),
+                       ('first_page_read_seconds', 'first page of rows read'),
+                       ('first_platform_request_seconds', 'first platform request')):
+        values = [result[key] for result in results if result[key] is not None]
+        if values:
+            print(f"  {label:<26} {statistics.median(values):6.3f}s  {max(values):6.3f}s")
+    print(f"  heavy modules at import:   {', '.join(results[-1]['modules_at_import']) or 'none'}")
+    print(f"  heavy modules by the end:  {', '.join(results[-1]['modules_loaded']) or 'none'}")
+
+
+if __name__ == '__main__':
+    main()
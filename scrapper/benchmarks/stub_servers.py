@@ -0,0 +1,212 @@
+"""
+Local stand-ins for Instagram, TikTok, the YouTube Data API and a Google
+Sheets worksheet, for benchmarking the pipeline without touching real services.
+"""
+import json
+import os
+import random
+import re
+import threading
+import time
+import zlib
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from string import Template
+from typing import Dict, List
+from urllib.parse import parse_qs, urlparse
+from ..services.sheet_service import GoogleSheetClient
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+A1_RANGE_RE = re.compile(r'([A-Z]+)(\d+)(?::([A-Z]+)(\d+))?$')
+
+
+def load_fixture(name: str) -> Template:
+    with open(os.path.join(FIXTURES, name), 'r', encoding='utf-8') as f:
+        return Template(f.read())
+
+
+def counts_for(video_id: str):
+    """Stable (views, likes) per video, so repeated runs serve the same numbers."""
+    seed = zlib.crc32(video_id.encode())
+    return 1000 + seed % 5000000, 10 + seed % 90000
+
+
+class StubPlatformServer:
+    """
+    One threaded HTTP server answering like the three platforms:
+    /reel/<id>/ and /p/<id>/ with a recorded Instagram page, /@user/video/<id>
+    with a recorded TikTok page, and .../videos?part=statistics like the
+    YouTube Data API. Every request waits latency ± jitter seconds first.
+    A fraction error_rate of page requests gets the platform's failure page
+    instead (Instagram's playback error, TikTok's captcha); API lookups always succeed.
+    """
+
+    def __init__(self, latency: float = 0.15, jitter: float = 0.05, error_rate: float = 0.0, seed: int = 7):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.requests = Counter()
+        self.errors = Counter()
+        # perf_counter() of the first request answered, for startup timing
+        self.first_request_at = None
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.pages = {
+            'instagram': (load_fixture('instagram_reel.html'), load_fixture('instagram_error.html')),
+            'tiktok': (load_fixture('tiktok_video.html'), load_fixture('tiktok_error.html')),
+        }
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self.server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def origin(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, name='stub-platforms', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _roll(self):
+        """(delay, failed) for one request."""
+        with self._lock:
+            delay = max(0.0, self._random.uniform(self.latency - self.jitter, self.latency + self.jitter))
+            return delay, self._random.random() < self.error_rate
+
+    def respond(self, path: str, query: str):
+        """(status, content type, body) for a request path."""
+        parts = [part for part in path.split('/') if part]
+        if self.first_request_at is None:
+            self.first_request_at = time.perf_counter()
+        if path.endswith('/videos'):
+            ids = parse_qs(query).get('id', [''])[0].split(',')
+            self.requests['youtube'] += 1
+            time.sleep(self._roll()[0])
+            items = []
+            for video_id in filter(None, ids):
+                views, likes = counts_for(video_id)
+                items.append({'id': video_id, 'statistics': {
+                    'viewCount': str(views), 'likeCount': str(likes), 'commentCount': '0'}})
+            return 200, 'application/json', json.dumps({'kind': 'youtube#videoListResponse', 'items': items})
+
+        if len(parts) >= 2 and parts[0] in ('reel', 'p', 'tv'):
+            platform, video_id = 'instagram', parts[1]
+        elif len(parts) >= 3 and parts[1] == 'video':
+            platform, video_id = 'tiktok', parts[2]
+        else:
+            return 404, 'text/plain', 'not found'
+
+        self.requests[platform] += 1
+        delay, failed = self._roll()
+        time.sleep(delay)
+        page, error_page = self.pages[platform]
+        if failed:
+            self.errors[platform] += 1
+            page = error_page
+        views, likes = counts_for(video_id)
+        return 200, 'text/html; charset=utf-8', page.substitute(video_id=video_id, views=views, likes=likes)
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                parts = urlparse(self.path)
+                status, content_type, body = stub.respond(parts.path, parts.query)
+                data = body.encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def column_index(letters: str) -> int:
+    index = 0
+    for letter in letters:
+        index = index * 26 + ord(letter) - 64
+    return index
+
+
+class StubWorksheet:
+    """
+    In-memory gspread Worksheet with the calls GoogleSheetClient makes
+    (row_values, row_count, batch_get, batch_update), each taking `latency` seconds.
+    Records when each row was read so per-row latency can be measured.
+    """
+
+    def __init__(self, headers: List[str], rows: List[Dict[str, str]], latency: float = 0.2):
+        self.headers = headers
+        self.cells = {}
+        for row_num, values in enumerate(rows, start=2):
+            for header, value in values.items():
+                self.cells[(row_num, headers.index(header) + 1)] = value
+        self.row_count = len(rows) + 1
+        self.latency = latency
+        self.calls = Counter()
+        self.read_at: Dict[int, float] = {}
+        self.cells_written = 0
+
+    def row_values(self, row: int) -> List[str]:
+        self.calls['row_values'] += 1
+        time.sleep(self.latency)
+        return list(self.headers) if row == 1 else [self.cells.get((row, col), '') for col in range(1, len(self.headers) + 1)]
+
+    def batch_get(self, ranges: List[str]) -> List[List[List[str]]]:
+        self.calls['batch_get'] += 1
+        time.sleep(self.latency)
+        now = time.perf_counter()
+        results = []
+        for a1 in ranges:
+            start_col, start_row, end_col, end_row = A1_RANGE_RE.match(a1).groups()
+            col = column_index(start_col)
+            first, last = int(start_row), int(end_row or start_row)
+            values = [[self.cells[(row, col)]] if self.cells.get((row, col)) else [] for row in range(first, last + 1)]
+            # Like the API, trailing empty rows are left out
+            while values and not values[-1]:
+                values.pop()
+            results.append(values)
+            for row in range(first, last + 1):
+                self.read_at.setdefault(row, now)
+        return results
+
+    def batch_update(self, updates: List[dict]):
+        self.calls['batch_update'] += 1
+        time.sleep(self.latency)
+        for update in updates:
+            match = A1_RANGE_RE.match(update['range'])
+            self.cells[(int(match.group(2)), column_index(match.group(1)))] = update['values'][0][0]
+        self.cells_written += len(updates)
+
+
+def stub_sheet_client(worksheet: StubWorksheet, finished_at: Dict[int, float]):
+    """
+    GoogleSheetClient subclass wired to `worksheet` instead of Google. Each
+    row's first status update is timed into finished_at.
+    """
+
+    class StubSheetClient(GoogleSheetClient):
+        def connect(self):
+            self.sheet = worksheet
+            self.headers = {name: index + 1 for index, name in enumerate(worksheet.row_values(1))}
+
+        def update_row(self, row_index, data):
+            if 'status' in data:
+                finished_at.setdefault(row_index, time.perf_counter())
+            super().update_row(row_index, data)
+
+    return StubSheetClient
@@ -1,147 +1,226 @@
 import os
 import json
 import time
-from datetime import datetime
 from .services.sheet_service import GoogleSheetClient
-from .services.logger import setup_logger
-from .platforms.youtube import YouTubeScraper
-from .platforms.instagram import InstagramScraper
-from .platforms.tiktok import TikTokScraper
+from .services.bookmark_source import BookmarkFileClient
+from .services.logger import configure_logging, setup_logger
+from .services.rate_limiter import all_rate_limiters
+from .services.http_client import close_http_client
+from .services.journal import RunJournal
+from .services.metrics import export_metrics, get_metrics
+from .pipeline import ScrapePipeline
+from .utils.freshness import check_priority
+from .sharding import merge_shard_journals, prepare_shard_profile, run_workers, shard_path
+import argparse
+import functools
 import asyncio
-import nest_asyncio
-
-# We still use nest_asyncio just in case gspread or other libs have internal loops,
-# though we are now running a proper top-level loop.
-nest_asyncio.apply()
 
 logger = setup_logger('main_controller')
 
-def load_config():
-    config_path = os.path.join(os.path.dirname(__file__), '..', 'config', 'settings.json')
+DEFAULT_CONFIG = os.path.join(os.path.dirname(__file__), '..', 'config', 'settings.json')
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Refresh social media metrics in the Google Sheet.")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--incremental', dest='incremental', action='store_true', default=None,
+                      help="Only scrape rows that are stale, failed or never scraped.")
+    mode.add_argument('--full', dest='incremental', action='store_false',
+                      help="Scrape every row, ignoring scraping_options.incremental.")
+    parser.add_argument('--resume', action='store_true',
+                        help="Continue a crashed run: skip rows it finished and replay unflushed sheet writes.")
+    parser.add_argument('--bookmarks', nargs='?', const='', default=None, metavar='PATH',
+                        help="Read video links from an exported bookmarks file (default bookmarks.path) "
+                             "and write results to bookmarks.output_path instead of the Google Sheet.")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Split the sheet across this many scraper processes and merge their results.")
+    parser.add_argument('--config', default=DEFAULT_CONFIG, metavar='PATH',
+                        help="Settings file to use instead of config/settings.json.")
+    parser.add_argument('--shard-index', type=int, default=0, metavar='I',
+                        help="Handle only shard I (0-based) of --shard-count; run one shard per host.")
+    parser.add_argument('--shard-count', type=int, default=1, metavar='N',
+                        help="Total number of shards the sheet is split into across hosts.")
+    parser.add_argument('--merge-journals', nargs='+', metavar='JOURNAL',
+                        help="Write the outcomes these shard journals never flushed to the sheet, then exit.")
+    parser.add_argument('--defer-writes', action='store_true', help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+def load_config(config_path=DEFAULT_CONFIG):
+    """settings.json, with the settings a run would otherwise only reject mid-way checked up front."""
     with open(config_path, 'r') as f:
-        return json.load(f)
-
-def get_scraper_for_url(url, config, active_scrapers):
-    scraper_instance = None
-    platform_name = None
-
-    if 'youtube.com' in url or 'youtu.be' in url:
-        platform_name = 'YouTubeScraper'
-        if platform_name in active_scrapers:
-            scraper_instance = active_scrapers[platform_name]
-        else:
-            scraper_instance = YouTubeScraper(config)
-            active_scrapers[platform_name] = scraper_instance
-    elif 'instagram.com' in url:
-        platform_name = 'InstagramScraper'
-        if platform_name in active_scrapers:
-            scraper_instance = active_scrapers[platform_name]
-        else:
-            scraper_instance = InstagramScraper(config)
-            active_scrapers[platform_name] = scraper_instance
-    elif 'tiktok.com' in url:
-        platform_name = 'TikTokScraper'
-        if platform_name in active_scrapers:
-            scraper_instance = active_scrapers[platform_name]
-        else:
-            scraper_instance = TikTokScraper(config)
-            active_scrapers[platform_name] = scraper_instance
-    return scraper_instance
-
-async def main():
+        config = json.load(f)
+    check_priority(config['scraping_options'].get('incremental', {}).get('priority', 'sheet'))
+    return config
+
+async def flush_periodically(sheet_client):
+    """Push buffered sheet writes out on time even when few rows are finishing."""
+    while True:
+        await asyncio.sleep(sheet_client.flush_seconds)
+        await asyncio.to_thread(sheet_client.flush_if_due)
+
+def resolve_path(path):
+    """settings.json paths are relative to the scrapper package, like '../data/...'."""
+    return os.path.abspath(os.path.join(os.path.dirname(__file__), path))
+
+def journal_path_for(config, bookmarks=False):
+    if bookmarks:
+        return resolve_path(config.get('bookmarks', {}).get('journal_path', '../data/bookmark_journal.jsonl'))
+    return resolve_path(config['scraping_options'].get('journal_path', '../data/run_journal.jsonl'))
+
+def open_bookmarks(config, args):
+    """BookmarkFileClient for --bookmarks; call connect() before reading."""
+    bookmarks_cfg = config.get('bookmarks', {})
+    return BookmarkFileClient(
+        resolve_path(args.bookmarks or bookmarks_cfg.get('path', '../data/bookmarks_export.html')),
+        resolve_path(bookmarks_cfg.get('output_path', '../data/bookmark_results.jsonl')),
+        page_size=bookmarks_cfg.get('page_size', 500),
+        flush_seconds=bookmarks_cfg.get('flush_seconds', 15),
+        resume=args.resume,
+    )
+
+async def connect_sheet(config_path=DEFAULT_CONFIG):
+    sheet_client = GoogleSheetClient(config_path)
+    await asyncio.to_thread(sheet_client.connect)
+    logger.info("Successfully connected to Google Sheet")
+    return sheet_client
+
+async def coordinate(config, args):
+    """Run one shard process per worker, then write their merged results to the sheet."""
+    passthrough = ['--resume'] if args.resume else []
+    if args.config != DEFAULT_CONFIG:
+        passthrough += ['--config', os.path.abspath(args.config)]
+    if args.incremental is not None:
+        passthrough.append('--incremental' if args.incremental else '--full')
+
+    exit_codes = await run_workers(args.workers, passthrough)
+    failed = [index for index, code in enumerate(exit_codes) if code != 0]
+    if failed:
+        # Their journals still hold every row they finished; rerun with --resume to complete them
+        logger.warning(f"Shard workers {failed} exited with errors")
+
+    journal_path = journal_path_for(config)
+    await merge_journals(args.config, [shard_path(journal_path, index) for index in range(args.workers)])
+
+async def merge_journals(config_path, journal_paths):
+    """Write the unflushed outcomes of shard journals to the sheet in a few batched calls."""
+    sheet_client = await connect_sheet(config_path)
+    merge_shard_journals(journal_paths, sheet_client)
+    logger.info(f"Sheets API calls this run: {sheet_client.api_calls}")
+
+async def main(args=None):
+    args = args or parse_args([])
     logger.info("Starting Social Media Scraper...")
 
     # 1. Load Config
     try:
-        config = load_config()
+        config = load_config(args.config)
     except Exception as e:
         logger.error(f"Failed to load config: {e}")
         return
 
-    # 2. Connect to Google Sheet
-    try:
-        sheet_client = GoogleSheetClient(os.path.join(os.path.dirname(__file__), '..', 'config', 'settings.json'))
-        sheet_client.connect()
-        logger.info("Successfully connected to Google Sheet")
-    except Exception as e:
-        logger.error(f"Failed to connect to Google Sheets: {e}")
+    logging_cfg = dict(config.get('logging', {}))
+    if args.shard_count > 1:
+        # Shard processes can't share one rotating file
+        logging_cfg['file'] = shard_path(logging_cfg.get('file', '../logs/scraper.log'), args.shard_index)
+    configure_logging(logging_cfg)
+
+    if not 0 <= args.shard_index < args.shard_count:
+        logger.error(f"--shard-index must be between 0 and {args.shard_count - 1}")
+        return
+    if args.merge_journals:
+        await merge_journals(args.config, [os.path.abspath(path) for path in args.merge_journals])
         return
 
-    # 3. Read Rows
-    rows = sheet_client.get_rows()
-    if not rows:
-        logger.warning("No rows found in sheet.")
+    if args.workers > 1:
+        if args.bookmarks is not None:
+            logger.error("--workers only supports Google Sheet runs, not --bookmarks")
+            return
+        await coordinate(config, args)
+        logger.info("Scraping run complete.")
         return
 
-    logger.info(f"Found {len(rows)} rows to process.")
+    # 2. Connect to Google Sheet (or the bookmarks file standing in for it) on a thread,
+    # while the pipeline and its cache are set up here
+    bookmarks = args.bookmarks is not None
+    sheet_client = open_bookmarks(config, args) if bookmarks else GoogleSheetClient(args.config)
+    connecting = asyncio.create_task(asyncio.to_thread(sheet_client.connect))
+
+    incremental_cfg = config['scraping_options'].get('incremental', {})
+    incremental = incremental_cfg.get('enabled', False) if args.incremental is None else args.incremental
+    journal_path = journal_path_for(config, bookmarks=bookmarks)
+    if args.shard_count > 1:
+        # Each shard needs its own browser profile and journal
+        scraping_ops = config['scraping_options']
+        scraping_ops['user_data_dir'] = prepare_shard_profile(scraping_ops, args.shard_index)
+        journal_path = shard_path(journal_path, args.shard_index)
+        logger.info(f"Running as shard {args.shard_index + 1}/{args.shard_count}")
+    pipeline = ScrapePipeline(config, sheet_client, incremental,
+                              shard_index=args.shard_index, shard_count=args.shard_count,
+                              defer_writes=args.defer_writes)
 
-    # Check for required columns
-    required_cols = config['google_sheets']['columns'].values()
-    if rows and not all(col in rows[0] for col in required_cols if col != "Video URL"): # video url key varies
-        # We do a loose check or rely on the get_rows dict keys
-        # The sheet_client already maps them? No, sheet_service uses dictreader which uses header row.
-        # Use first row keys to validate
-        available_headers = list(rows[0].keys())
-        missing = [col for col in required_cols if col not in available_headers and col != config['google_sheets']['columns']['url']]
+    try:
+        await connecting
+    except Exception as e:
+        logger.error(f"Failed to open bookmarks: {e}" if bookmarks else f"Failed to connect to Google Sheets: {e}")
+        await pipeline.close()
+        return
+    if bookmarks:
+        logger.info(f"Reading links from {sheet_client.bookmarks_path}; results go to {sheet_client.output_path}")
+    else:
+        logger.info("Successfully connected to Google Sheet")
+        # Check for required columns
+        missing = [col for col in config['google_sheets']['columns'].values() if col not in sheet_client.headers]
         if missing:
-             logger.warning(f"Missing columns in sheet: {missing}. Update sheet headers to match settings.json.")
-
-    active_scrapers = {}
-
-    for i, row in enumerate(rows):
-        row_num = i + 2 # 1-based index, +1 for header
-        
-        url_col = config['google_sheets']['columns']['url']
-        url = row.get(url_col)
-
-        if not url:
-            logger.warning(f"Row {row_num} has no URL. Skipping.")
-            continue
-
-        logger.info(f"Processing Row {row_num}: {url}")
-
-        try:
-            scraper = get_scraper_for_url(url, config, active_scrapers)
-            if not scraper:
-                logger.warning(f"No scraper found for URL: {url}")
-                sheet_client.update_row(row_num, {'status': 'UNSUPPORTED_PLATFORM'})
-                continue
-
-            # Scrape
-            result = await scraper.scrape(url)
-            
-            if result.get('error'):
-                logger.error(f"Error scraping row {row_num}: {result['error']}")
-                sheet_client.update_row(row_num, {'status': f"ERROR: {result['error']}"})
-                continue
-
-            # Update Sheet
-            update_data = {
-                'views': result['views'],
-                'likes': result['likes'],
-                'last_updated': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                'status': 'SUCCESS',
-                'platform': scraper.__class__.__name__.replace('Scraper', '')
-            }
-            sheet_client.update_row(row_num, update_data)
-
-        except Exception as e:
-            logger.error(f"Unexpected error processing row {row_num}: {e}")
-            try:
-                sheet_client.update_row(row_num, {'status': f"CRITICAL_ERROR: {str(e)}"})
-            except:
-                pass # If update fails, just log it.
-
-    # Cleanup
-    logger.info("Cleaning up scrapers...")
-    for scraper in active_scrapers.values():
-        await scraper.close()
+            logger.warning(f"Missing columns in sheet: {missing}. Update sheet headers to match settings.json.")
+
+    # Opened only once the sheet is reachable: a new journal moves the previous one aside
+    journal = RunJournal(journal_path, resume=args.resume)
+    sheet_client.on_flush = journal.mark_flushed
+    pipeline.journal = journal
+    flusher = asyncio.create_task(flush_periodically(sheet_client))
+
+    try:
+        await pipeline.replay_journal()
+
+        # 3. Stream rows page by page; scraping starts as soon as the first page arrives
+        async for page in sheet_client.iter_pages(reverse=pipeline.priority == 'newest'):
+            await pipeline.submit_page(page)
+
+        await pipeline.join()
+
+    finally:
+        flusher.cancel()
+        # Final flush also runs on Ctrl-C so finished rows are never lost
+        sheet_client.flush()
+        logger.info(f"Sheets API calls this run: {sheet_client.api_calls}")
+
+        # Cleanup
+        await pipeline.close()
+        journal.close()
+        await close_http_client()
+        for limiter in all_rate_limiters().values():
+            logger.info(f"Rate limiter: {limiter.snapshot()}")
+
+        extra = {
+            'rows': dict(pipeline.counts),
+            'sheets_api_calls': sheet_client.api_calls,
+            'rate_limiters': [limiter.snapshot() for limiter in all_rate_limiters().values()],
+        }
+        if pipeline.retries:
+            extra['retries'] = pipeline.retries.snapshot()
+        if pipeline.cache:
+            extra['cache'] = {'hits': pipeline.cache.hits, 'misses': pipeline.cache.misses}
+        path_hook = None
+        if args.shard_count > 1:
+            extra['shard'] = f"{args.shard_index + 1}/{args.shard_count}"
+            path_hook = functools.partial(shard_path, shard_index=args.shard_index)
+        export_metrics(get_metrics(), config['scraping_options'].get('metrics', {}),
+                       os.path.dirname(__file__), extra, path_hook)
     
     logger.info("Scraping run complete.")
 
 if __name__ == "__main__":
     try:
-        asyncio.run(main())
+        asyncio.run(main(parse_args()))
     except KeyboardInterrupt:
         logger.info("Scraper stopped by user.")
     except Exception as e:
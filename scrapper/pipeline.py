@@ -0,0 +1,403 @@
+import asyncio
+import functools
+import os
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Iterable
+from .platforms import get_scraper_class
+from .services.history import Sample, growth_between, open_history
+from .services.http_client import get_http_client
+from .services.logger import setup_logger
+from .services.metrics import error_class, get_metrics
+from .services.result_cache import ResultCache
+from .services.retry import RetryQueue, classify_failure, load_retry_policy
+from .services.scheduler import RowScheduler
+from .sharding import shard_of
+from .utils.freshness import TIMESTAMP_FORMAT, check_priority, is_fresh, order_rows, ttl_for
+from .utils.url_parser import is_short_link, parse_url, resolve_short_links
+
+logger = setup_logger('pipeline')
+
+def success_update(result, scraper, fetched_at=None):
+    """Sheet update for a successful result; fetched_at is set for cached results."""
+    scraped_at = datetime.fromtimestamp(fetched_at) if fetched_at else datetime.now()
+    return {
+        'views': result['views'],
+        'likes': result['likes'],
+        'last_updated': scraped_at.strftime(TIMESTAMP_FORMAT),
+        'status': 'SUCCESS',
+        'platform': scraper.__class__.__name__.replace('Scraper', '')
+    }
+
+def open_result_cache(config):
+    """ResultCache from scraping_options.cache, or None when disabled."""
+    cache_cfg = config['scraping_options'].get('cache', {})
+    if not cache_cfg.get('enabled', False):
+        return None
+    path = os.path.abspath(os.path.join(os.path.dirname(__file__), cache_cfg.get('path', '../data/result_cache.sqlite3')))
+    return ResultCache(path, cache_cfg.get('ttl_minutes', {}), cache_cfg.get('max_entries', 200000))
+
+
+class ScrapePipeline:
+    """
+    Takes sheet rows as they stream in, routes each URL to its platform's
+    scraper, and writes outcomes back through the sheet client.
+    Rows listing the same video share one scrape, whether they arrive before
+    or after it finishes; fresh results come from the cache; everything else is queued on the per-platform scheduler.
+    """
+
+    def __init__(self, config: dict, sheet_client, incremental: bool = False, journal=None,
+                 shard_index: int = 0, shard_count: int = 1, defer_writes: bool = False):
+        self.config = config
+        self.sheet_client = sheet_client
+        self.journal = journal
+        self.shard_index = shard_index
+        self.shard_count = shard_count
+        # Shard workers only journal; the coordinator writes the merged results
+        self.defer_writes = defer_writes
+        self.scheduler = RowScheduler(config['scraping_options'].get('concurrency', {}),
+                                      max_queued=config['scraping_options'].get('max_queued_rows', 2000))
+        self.cache = open_result_cache(config)
+        self.active_scrapers = {}
+        # (platform, video_id) -> (row_num, sheet url) pairs waiting on the scrape queued for it
+        self.inflight = {}
+        # platform -> (key, canonical url) jobs waiting to fill a scrape_batch() call
+        self.batches = {}
+        # (platform, video_id) -> sheet update of every scrape finished this run, for rows listing it later
+        self.finished = {}
+        self.counts = Counter()
+        self.metrics = get_metrics()
+        # Failed scrapes worth another try wait here, off the worker pools
+        policy = load_retry_policy(config['scraping_options'])
+        self.retries = RetryQueue(policy) if policy else None
+
+        # Every scraped sample is appended to the history; views/hour is written when the sheet has the column
+        self.history = open_history(config)
+        history_cfg = config['scraping_options'].get('history', {})
+        self.history_window = history_cfg.get('window_hours', 24)
+        self.views_per_hour = bool(self.history) and 'views_per_hour' in config.get('google_sheets', {}).get('columns', {})
+        # (platform, video_id) -> history Sample each new scrape's rate is measured against, loaded per page
+        self.references = {}
+        # Platforms in scraping_options.prewarm whose browser starts with the first page that lists them
+        self.prewarm_pending = set(config['scraping_options'].get('prewarm', []))
+
+        # Incremental mode: skip rows refreshed within their platform's TTL
+        incremental_cfg = config['scraping_options'].get('incremental', {})
+        self.incremental = incremental
+        # Checked even when incremental is off, so a bad setting fails here rather than mid-run
+        priority = check_priority(incremental_cfg.get('priority', 'sheet'))
+        self.priority = priority if incremental else 'sheet'
+        self.ttl_minutes = incremental_cfg.get('ttl_minutes', {})
+        self.started_at = datetime.now()
+
+    def get_scraper(self, platform):
+        """One shared scraper instance per platform, created on first use."""
+        if platform not in self.active_scrapers:
+            scraper_class = get_scraper_class(platform)
+            if scraper_class is None:
+                return None
+            self.active_scrapers[platform] = scraper_class(self.config)
+        return self.active_scrapers[platform]
+
+    def prewarm(self, platforms: Iterable[str]):
+        """Start the browsers of these platforms in the background, ahead of their first browser scrape."""
+        for platform in platforms:
+            self.prewarm_pending.discard(platform)
+            scraper = self.get_scraper(platform)
+            if scraper is None:
+                logger.warning(f"Cannot prewarm unknown platform '{platform}'")
+            else:
+                scraper.prewarm()
+
+    async def write_row(self, row_num, url, data):
+        """
+        Journal a row outcome, then buffer it for the sheet off the event loop
+        (a due flush may hit the network).
+        """
+        if self.journal:
+            self.journal.record(row_num, url, data)
+        if not self.defer_writes:
+            await asyncio.to_thread(self.sheet_client.update_row, row_num, data)
+
+    def owns(self, row_num, sheet_url, parsed=None) -> bool:
+        """
+        Whether this shard handles the row. Videos are sharded by canonical ID
+        so duplicate rows always meet on the same shard; short links by the link
+        itself, known before resolving it and whether or not that succeeds;
+        anything else by row number.
+        """
+        if self.shard_count == 1:
+            return True
+        if sheet_url and is_short_link(sheet_url):
+            key = f"link:{sheet_url.strip()}"
+        elif parsed:
+            key = f"{parsed.platform}:{parsed.video_id}"
+        else:
+            key = f"row:{row_num}"
+        return shard_of(key, self.shard_count) == self.shard_index
+
+    async def replay_journal(self):
+        """Re-queue outcomes a crashed run journaled but never flushed to the sheet."""
+        unflushed = self.journal.unflushed() if self.journal and not self.defer_writes else {}
+        for row_num, data in unflushed.items():
+            await asyncio.to_thread(self.sheet_client.update_row, row_num, data)
+        if unflushed:
+            logger.info(f"Replayed {len(unflushed)} unflushed rows from the journal")
+
+    async def submit_page(self, rows: Iterable):
+        """
+        Queue one page of SheetRows, resolving its short links in a single bulk pass.
+        Waits first while max_queued_rows jobs are already queued; the whole page is
+        then queued at once, so one platform's backlog never holds up another's rows.
+        """
+        await self.scheduler.wait_for_room()
+        rows = order_rows(rows, self.priority)
+
+        # Short links (vm.tiktok.com, /t/, /share/) only reveal their video ID after a redirect;
+        # only this shard's are resolved
+        short_links = [row.get('url') for row in rows
+                       if row.get('url') and is_short_link(row.get('url')) and self.owns(row.row_num, row.get('url'))]
+        resolved = {}
+        if short_links:
+            resolved = await resolve_short_links(short_links, get_http_client(self.config['scraping_options']))
+
+        targets = [(row, resolved.get(row.get('url'), row.get('url'))) for row in rows]
+        if self.views_per_hour or self.prewarm_pending:
+            parsed = [p for p in (parse_url(url) for _, url in targets if url) if p]
+            # Only platforms the sheet actually lists get a browser, so YouTube-only runs never start one
+            self.prewarm(self.prewarm_pending & {p.platform for p in parsed})
+            if self.views_per_hour:
+                # One history query for the whole page rather than one per scraped row
+                keys = {(p.platform, p.video_id) for p in parsed}
+                self.references.update(self.history.reference_samples(keys, self.history_window))
+
+        for row, url in targets:
+            await self.submit(row, url)
+        await self.queue_batches()
+
+    async def submit(self, row, url, attempt=0):
+        """
+        Route a single row: cache hit, duplicate of an in-flight video, or a new scrape job.
+        attempt counts earlier tries at resolving the row's short link.
+        """
+        row_num = row.row_num
+        if not attempt:
+            self.counts['rows'] += 1
+
+        if self.journal and self.journal.is_done(row_num, row.get('url')):
+            self.counts['resumed'] += 1
+            self.sheet_client.skip_row(row_num)
+            return
+
+        parsed = parse_url(url) if url else None
+        if not self.owns(row_num, row.get('url'), parsed):
+            self.counts['other_shard'] += 1
+            self.sheet_client.skip_row(row_num)
+            return
+
+        if not url:
+            logger.warning(f"Row {row_num} has no URL. Skipping.")
+            self.sheet_client.skip_row(row_num)
+            return
+
+        if not parsed and is_short_link(url):
+            # Its redirect failed to resolve; that is a network problem, not an unsupported link
+            if not self.retry_short_link(row, attempt + 1):
+                await self.write_row(row_num, row.get('url'), {'status': "ERROR: Could not resolve short link"})
+            return
+
+        scraper = self.get_scraper(parsed.platform) if parsed else None
+        if not scraper:
+            logger.warning(f"No scraper found for URL: {url}")
+            await self.write_row(row_num, row.get('url'), {'status': 'UNSUPPORTED_PLATFORM'})
+            return
+
+        if self.incremental and is_fresh(row, ttl_for(scraper.platform, self.ttl_minutes), self.started_at):
+            self.counts['fresh'] += 1
+            self.sheet_client.skip_row(row_num)
+            return
+
+        key = (parsed.platform, parsed.video_id)
+        if key in self.finished:
+            # Same video listed again after its scrape finished; reuse that outcome
+            self.counts['duplicate'] += 1
+            await self.write_row(row_num, row.get('url'), self.finished[key])
+            return
+        cached = self.cache.get(*key) if self.cache else None
+        if cached:
+            self.counts['cached'] += 1
+            await self.write_row(row_num, row.get('url'), success_update(cached, scraper, cached['fetched_at']))
+            return
+        if key in self.inflight:
+            # Same video listed again; it shares the scrape already queued
+            self.counts['duplicate'] += 1
+            self.inflight[key].append((row_num, row.get('url')))
+            return
+        self.inflight[key] = [(row_num, row.get('url'))]
+
+        if scraper.batch_size > 1:
+            # Grouped into one scrape_batch() call, queued when full or at the end of the page
+            batch = self.batches.setdefault(scraper.platform, [])
+            batch.append((key, parsed.canonical_url))
+            if len(batch) >= scraper.batch_size:
+                await self.queue_batch(scraper)
+            return
+
+        # Bind loop variables now; the job runs later on a platform worker
+        job = functools.partial(self.process_url, key, parsed.canonical_url, scraper)
+        await self.scheduler.submit(scraper.platform, job, limit=scraper.max_concurrency)
+
+    def record_history(self, key, result, update_data):
+        """Append a fresh result to the history, adding views/hour to the row update when enabled."""
+        now = int(time.time())
+        self.history.record(*key, result['views'], result['likes'], now)
+        reference = self.references.pop(key, None)
+        if self.views_per_hour and reference:
+            rate = growth_between(reference, Sample(now, result['views'], result['likes'])).views_per_hour
+            if rate is not None:
+                update_data['views_per_hour'] = rate
+
+    def retry_later(self, key, url, scraper, failure, attempt) -> bool:
+        """
+        Queue another scrape of a failed URL once its backoff delay has passed.
+        Its rows stay in flight meanwhile. False when the failure is final.
+        """
+        if not self.retries:
+            return False
+        job = functools.partial(self.process_url, key, url, scraper, attempt)
+        delay = self.retries.schedule(
+            failure, attempt, lambda: self.scheduler.submit(scraper.platform, job, limit=scraper.max_concurrency))
+        if delay is None:
+            return False
+        self.metrics.count('retries', platform=scraper.platform, reason=failure)
+        row_nums = [row_num for row_num, _ in self.inflight[key]]
+        logger.warning(f"Rows {row_nums} failed ({failure}); retry {attempt} in {delay:.0f}s")
+        return True
+
+    def retry_short_link(self, row, attempt) -> bool:
+        """Queue another try at resolving a row's short link, as a network error. False when the failure is final."""
+        if not self.retries:
+            return False
+        url = row.get('url')
+
+        async def resubmit():
+            resolved = await resolve_short_links([url], get_http_client(self.config['scraping_options']))
+            await self.submit(row, resolved.get(url, url), attempt)
+            await self.queue_batches()
+
+        delay = self.retries.schedule('network_error', attempt, resubmit)
+        if delay is None:
+            return False
+        self.metrics.count('retries', platform='short_link', reason='network_error')
+        logger.warning(f"Row {row.row_num}: could not resolve {url}; retry {attempt} in {delay:.0f}s")
+        return True
+
+    async def process_url(self, key, url, scraper, attempt=0):
+        """
+        Scrape one URL and write the outcome to every sheet row that lists it.
+        attempt counts earlier tries; retryable failures go to the retry queue instead of the sheet.
+        """
+        row_nums = [row_num for row_num, _ in self.inflight[key]]
+        logger.info(f"Processing Row {row_nums[0]}: {url}" + (f" (retry {attempt})" if attempt else ""))
+        try:
+            with self.metrics.time('scrape', scraper.platform):
+                result = await scraper.scrape(url)
+        except Exception as e:
+            result = e
+        await self.finish(key, url, scraper, result, attempt)
+
+    async def process_batch(self, jobs, scraper):
+        """
+        Scrape a list of (key, url) jobs with one scraper.scrape_batch() call,
+        then finish each video as process_url would. Retries go back one URL at a time.
+        """
+        logger.info(f"Processing {len(jobs)} {scraper.platform} videos in one batch")
+        try:
+            with self.metrics.time('scrape_batch', scraper.platform):
+                results = await scraper.scrape_batch([key[1] for key, _ in jobs])
+        except Exception as e:
+            results = {key[1]: e for key, _ in jobs}
+        for key, url in jobs:
+            result = results.get(key[1])
+            if result is None:
+                result = {'views': 0, 'likes': 0, 'error': "No result returned for this video"}
+            await self.finish(key, url, scraper, result, 0)
+
+    async def queue_batches(self):
+        """Hand every partly filled batch to the scheduler."""
+        for platform, jobs in list(self.batches.items()):
+            if jobs:
+                await self.queue_batch(self.get_scraper(platform))
+
+    async def queue_batch(self, scraper):
+        jobs = self.batches.pop(scraper.platform, [])
+        if jobs:
+            job = functools.partial(self.process_batch, jobs, scraper)
+            await self.scheduler.submit(scraper.platform, job, limit=scraper.max_concurrency)
+
+    async def finish(self, key, url, scraper, result, attempt):
+        """
+        Write a scrape's result (or the exception it raised) to every row
+        listing the video, unless the failure is worth a retry.
+        """
+        row_nums = [row_num for row_num, _ in self.inflight[key]]
+        platform = scraper.platform
+        failure = None
+        try:
+            if isinstance(result, Exception):
+                raise result
+            if result.get('error'):
+                logger.error(f"Error scraping rows {row_nums}: {result['error']}")
+                update_data = {'status': f"ERROR: {result['error']}"}
+                outcome = result.get('error_class') or error_class(result['error'])
+                failure = classify_failure(result['error'], result.get('error_class'))
+            else:
+                if self.cache:
+                    self.cache.put(*key, result)
+                update_data = success_update(result, scraper)
+                if self.history:
+                    self.record_history(key, result, update_data)
+                outcome = 'success'
+
+        except Exception as e:
+            logger.error(f"Unexpected error processing rows {row_nums}: {e}")
+            update_data = {'status': f"CRITICAL_ERROR: {str(e)}"}
+            outcome = error_class(e)
+            failure = classify_failure(e)
+        self.metrics.count('scrapes', platform=platform, outcome=outcome)
+        if failure and self.retry_later(key, url, scraper, failure, attempt + 1):
+            return
+
+        # From here on, later duplicates of this URL are answered from self.finished instead of joining us
+        self.finished[key] = update_data
+        rows = self.inflight.pop(key)
+        try:
+            with self.metrics.time('write_rows', platform):
+                for row_num, sheet_url in rows:
+                    await self.write_row(row_num, sheet_url, update_data)
+        except Exception as e:
+            logger.error(f"Failed to write rows {[row_num for row_num, _ in rows]}: {e}")
+
+    async def join(self):
+        """Wait for every queued scrape to finish, including retries still backing off."""
+        while True:
+            await self.scheduler.drain()
+            if not (self.retries and self.retries.pending):
+                break
+            # Each retry lands back on the scheduler when its delay is up; drain again after that
+            await self.retries.wait()
+        await self.scheduler.join()
+        logger.info(f"Rows seen: {dict(self.counts)}")
+
+    async def close(self):
+        if self.retries:
+            # Rows still waiting for a retry are left unwritten; --resume picks them up
+            self.retries.cancel()
+        logger.info("Cleaning up scrapers...")
+        for scraper in self.active_scrapers.values():
+            await scraper.close()
+        if self.cache:
+            self.cache.close()
+        if self.history:
+            self.history.close()
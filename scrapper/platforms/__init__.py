@@ -0,0 +1,18 @@
+import importlib
+
+# Platform key (as returned by utils.url_parser) -> (module, scraper class).
+# Modules are imported on first use, so a run without TikTok rows never loads tiktok.py.
+SCRAPERS = {
+    'youtube': ('.youtube', 'YouTubeScraper'),
+    'instagram': ('.instagram', 'InstagramScraper'),
+    'tiktok': ('.tiktok', 'TikTokScraper'),
+}
+
+
+def get_scraper_class(platform: str):
+    """Scraper class registered for a platform, or None if unsupported."""
+    entry = SCRAPERS.get(platform)
+    if entry is None:
+        return None
+    module_name, class_name = entry
+    return getattr(importlib.import_module(module_name, __name__), class_name)
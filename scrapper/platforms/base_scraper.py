@@ -1,19 +1,65 @@
 from abc import ABC, abstractmethod
-from playwright.async_api import async_playwright, BrowserContext, Page
+from collections import Counter
+from typing import TYPE_CHECKING
 import asyncio
+import json
 import os
+from urllib.parse import urlparse
+from .browser_pool import BrowserPool
+from .dom_extractor import DomExtractor
+from ..services.diagnostics import get_debug_capture
 from ..services.logger import setup_logger
+from ..services.metrics import get_metrics
+from ..services.rate_limiter import get_rate_limiter
+
+if TYPE_CHECKING:
+    from playwright.async_api import Page
 
 logger = setup_logger('base_scraper')
 
 class BaseScraper(ABC):
+    # Key used in settings.json sections (platforms, scraping_options.concurrency)
+    platform = None
+    # Whether scrapes go through Playwright; prewarm() is a no-op otherwise
+    uses_browser = True
+    # Rows the pipeline groups into one scrape_batch(video_ids) call; 1 means scrape() per row
+    batch_size = 1
+
     def __init__(self, config: dict):
         self.config = config
         self.scraping_ops = config['scraping_options']
         self.browser = None
         self.context = None
-        self.page = None
+        self.pool = None
         self.playwright = None
+        self._browser_lock = asyncio.Lock()
+        self._prewarm = None
+        self.blocked_requests = 0
+        self.rate_limiter = get_rate_limiter(self.platform, self.scraping_ops)
+        self.metrics = get_metrics()
+        # Which extraction strategy answered each scrape, e.g. json_ld, meta, dom or none
+        self.strategy_hits = Counter()
+        # Compiled once here; every page reuses the same probe plan
+        self.dom_extractor = DomExtractor(self.platform_config.get('selectors', {}),
+                                          self.scraping_ops.get('metric_locale', 'auto'))
+        self.diagnostics = get_debug_capture(self.scraping_ops)
+
+    @property
+    def platform_config(self) -> dict:
+        """This platform's section of settings.json 'platforms'."""
+        return self.config.get('platforms', {}).get(self.platform, {})
+
+    @property
+    def configured_concurrency(self) -> int:
+        """Concurrency limit for this platform from scraping_options.concurrency."""
+        limits = self.scraping_ops.get('concurrency', {})
+        return max(1, int(limits.get(self.platform, 1)))
+
+    @property
+    def max_concurrency(self) -> int:
+        """How many scrape() calls may safely run at once on this instance."""
+        # Browser scrapers get one pooled page per concurrent scrape
+        return self.configured_concurrency
 
     def _get_user_data_dir(self):
         """Resolve user data directory for consistent contexts."""
@@ -21,8 +67,24 @@ class BaseScraper(ABC):
         return os.path.abspath(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 
                                             base_dir.replace('../', '')))
 
+    def _get_cookies_path(self):
+        """Where browser cookies are exported for the HTTP fetch tier."""
+        return self.scraping_ops.get('cookies_file') or os.path.join(self._get_user_data_dir(), 'cookies.json')
+
+    async def _export_cookies(self):
+        """Save the context's cookies so HTTP fetches can reuse the logged-in session."""
+        try:
+            cookies = await self.context.cookies()
+            with open(self._get_cookies_path(), 'w', encoding='utf-8') as f:
+                json.dump(cookies, f)
+        except Exception as e:
+            logger.warning(f"Could not export browser cookies: {e}")
+
     async def start_browser(self, headless=True):
         """Start Playwright browser with persistent context."""
+        # Imported here so runs that never open a browser (YouTube-only sheets) skip loading Playwright
+        from playwright.async_api import async_playwright
+
         self.playwright = await async_playwright().start()
         user_data_dir = self._get_user_data_dir()
         
@@ -38,18 +100,120 @@ class BaseScraper(ABC):
             user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
             args=['--disable-blink-features=AutomationControlled']
         )
-        self.page = self.context.pages[0] if self.context.pages else await self.context.new_page()
+        await self._install_request_filter()
+
+        pool_ops = self.scraping_ops.get('browser_pool', {})
+        self.pool = BrowserPool(self.context,
+                                size=self.configured_concurrency,
+                                recycle_after=pool_ops.get('recycle_after', 50),
+                                platform=self.platform)
+        await self.pool.start()
+
+    async def _install_request_filter(self):
+        """Abort requests we never read from (video, images, fonts, trackers)."""
+        rules = self.platform_config.get('request_blocking')
+        if not rules or not rules.get('enabled', True):
+            return
+        self._blocked_types = set(rules.get('resource_types', []))
+        self._deny_domains = tuple(rules.get('deny_domains', []))
+        self._allow_domains = tuple(rules.get('allow_domains', []))
+        await self.context.route('**/*', self._route_request)
+        logger.info(f"Blocking {sorted(self._blocked_types)} and {len(self._deny_domains)} tracker domains for {self.platform}")
+
+    @staticmethod
+    def _host_matches(host: str, domains: tuple) -> bool:
+        return any(host == d or host.endswith('.' + d) for d in domains)
+
+    async def _route_request(self, route):
+        request = route.request
+        host = urlparse(request.url).hostname or ''
+        # Allow list wins over both resource type and deny list
+        if not self._host_matches(host, self._allow_domains) and (
+                request.resource_type in self._blocked_types or self._host_matches(host, self._deny_domains)):
+            self.blocked_requests += 1
+            await route.abort()
+        else:
+            await route.continue_()
+
+    def target_url(self, url: str) -> str:
+        """
+        Where to actually fetch url: the same path on platforms.<name>.origin
+        when that is set (e.g. a local stub server for benchmarks), else url itself.
+        """
+        origin = self.platform_config.get('origin')
+        if not origin:
+            return url
+        parts = urlparse(url)
+        return origin.rstrip('/') + parts.path + (f"?{parts.query}" if parts.query else '')
+
+    async def navigate(self, page: 'Page', url: str):
+        """
+        Go to url using the platform's wait strategy, after waiting for a
+        slot from the platform's shared rate limiter.
+        wait_until defaults to 'load'; with 'domcontentloaded' or 'commit' we
+        instead wait for wait_for_selector, and carry on if it never shows.
+        """
+        cfg = self.platform_config
+        with self.metrics.time('rate_limit_wait', self.platform):
+            await self.rate_limiter.acquire()
+        with self.metrics.time('navigate', self.platform):
+            await page.goto(self.target_url(url), timeout=cfg.get('timeout', 30000), wait_until=cfg.get('wait_until', 'load'))
+        selector = cfg.get('wait_for_selector')
+        if selector:
+            try:
+                # 'attached' so data-only nodes like <script> blobs count too
+                with self.metrics.time('wait_for_selector', self.platform):
+                    await page.wait_for_selector(selector, state='attached',
+                                                 timeout=cfg.get('selector_timeout', 5000))
+            except Exception as e:
+                logger.debug(f"Selector '{selector}' not found after navigation: {e}")
+
+    async def ensure_browser(self):
+        """Start the browser once, even if several scrapes ask at the same time."""
+        async with self._browser_lock:
+            if not self.context:
+                await self.start_browser(headless=self.scraping_ops['headless'])
+
+    def prewarm(self):
+        """Launch the browser in the background so the first scrape finds it running."""
+        if self.uses_browser and self._prewarm is None:
+            self._prewarm = asyncio.ensure_future(self._prewarm_browser())
+
+    async def _prewarm_browser(self):
+        try:
+            await self.ensure_browser()
+            logger.info(f"{self.platform}: browser prewarmed")
+        except Exception as e:
+            # The first scrape retries the launch and reports the error itself
+            logger.warning(f"{self.platform}: browser prewarm failed: {e}")
+
+    def lease_page(self):
+        """Borrow a page from the pool: `async with self.lease_page() as page:`"""
+        return self.pool.lease()
 
     async def close(self):
         """Cleanup resources."""
+        if self.blocked_requests:
+            logger.info(f"{self.platform}: blocked {self.blocked_requests} requests this run")
+        await self.diagnostics.drain()
+        if self._prewarm:
+            # A launch still in progress would otherwise leave a browser behind
+            await self._prewarm
         if self.context:
+            await self._export_cookies()
             await self.context.close()
         if self.playwright:
             await self.playwright.stop()
             
-    async def human_delay(self):
-        """Sleep for throttle_seconds."""
-        await asyncio.sleep(self.scraping_ops.get('throttle_seconds', 3))
+    def record_strategy(self, strategy: str):
+        """Count the strategy that produced (or failed to produce) a scrape's metrics."""
+        self.strategy_hits[strategy] += 1
+        self.metrics.count('strategy', platform=self.platform, strategy=strategy)
+
+    def report_error(self, error: Exception):
+        """Feed a failed scrape into the rate limiter; timeouts mean we are going too fast."""
+        if 'Timeout' in type(error).__name__:
+            self.rate_limiter.record_throttle('timeout')
 
     @abstractmethod
     async def scrape(self, url: str) -> dict:
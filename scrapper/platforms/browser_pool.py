@@ -0,0 +1,77 @@
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING
+import asyncio
+from ..services.logger import setup_logger
+from ..services.metrics import get_metrics
+
+if TYPE_CHECKING:
+    from playwright.async_api import BrowserContext, Page
+
+logger = setup_logger('browser_pool')
+
+class BrowserPool:
+    """
+    Fixed set of pages inside one browser context, leased out one scrape at a time.
+    Pages are recycled after `recycle_after` navigations to cap renderer memory,
+    and crashed or closed pages are swapped for fresh ones on their next lease.
+    """
+
+    def __init__(self, context: 'BrowserContext', size: int = 1, recycle_after: int = 50, platform: str = 'browser'):
+        self.context = context
+        self.platform = platform
+        self.size = max(1, int(size))
+        self.recycle_after = recycle_after
+        self._idle: asyncio.Queue = asyncio.Queue()
+        self._navigations = {}
+        self._crashed = set()
+
+    async def start(self):
+        """Open pages until the pool is full, reusing any the context already has."""
+        existing = list(self.context.pages)
+        for i in range(self.size):
+            page = existing[i] if i < len(existing) else await self.context.new_page()
+            self._track(page)
+            self._idle.put_nowait(page)
+        logger.info(f"Browser pool ready with {self.size} page(s)")
+
+    def _track(self, page: 'Page'):
+        self._navigations[page] = 0
+        page.on('crash', self._on_crash)
+
+    def _on_crash(self, page: 'Page'):
+        logger.warning("Page crashed; it will be replaced on next lease.")
+        self._crashed.add(page)
+
+    async def _replace(self, page: 'Page', reason: str) -> 'Page':
+        logger.info(f"Replacing pooled page ({reason})")
+        self._navigations.pop(page, None)
+        self._crashed.discard(page)
+        try:
+            if not page.is_closed():
+                await page.close()
+        except Exception as e:
+            logger.debug(f"Closing old page failed: {e}")
+        new_page = await self.context.new_page()
+        self._track(new_page)
+        return new_page
+
+    async def _healthy(self, page: 'Page') -> 'Page':
+        if page.is_closed() or page in self._crashed:
+            return await self._replace(page, 'crashed')
+        if self.recycle_after and self._navigations.get(page, 0) >= self.recycle_after:
+            return await self._replace(page, f'{self.recycle_after} navigations')
+        return page
+
+    @asynccontextmanager
+    async def lease(self):
+        """Borrow a page for one scrape; it goes back to the pool afterwards."""
+        # Time spent waiting for a free page says whether the pool is too small
+        with get_metrics().time('page_lease', self.platform):
+            page = await self._idle.get()
+        try:
+            page = await self._healthy(page)
+            self._navigations[page] += 1
+            yield page
+        finally:
+            # Even a broken page goes back; the next lease will replace it
+            self._idle.put_nowait(page)
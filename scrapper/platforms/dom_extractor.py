@@ -0,0 +1,124 @@
+from typing import Dict, List, NamedTuple, Optional
+import re
+from ..services.logger import setup_logger
+from ..utils.normalization import get_grammar
+
+logger = setup_logger('dom_extractor')
+
+# Playwright-only selector syntax that document.querySelectorAll can't run
+UNSUPPORTED_SYNTAX = ('>>', ':text(', ':text-is(', ':text-matches(', ':visible', ':nth-match(',
+                      'text=', 'xpath=', 'css=', 'internal:')
+
+HAS_TEXT_RE = re.compile(r"^(?P<css>.*?):has-text\((?P<quote>['\"])(?P<text>.*?)(?P=quote)\)(?P<rest>.*)$")
+
+# Runs every selector for every metric in one round trip. For each selector it
+# returns the innerText of the first element that matches it, or null.
+PROBE_JS = """(plan) => {
+    const normalize = (s) => (s || '').replace(/\\s+/g, ' ').trim().toLowerCase();
+    const first = ({css, text, within}) => {
+        let nodes;
+        try {
+            nodes = document.querySelectorAll(css);
+        } catch (e) {
+            return null;
+        }
+        for (const el of nodes) {
+            if (text !== null && !normalize(el.innerText || el.textContent).includes(text)) continue;
+            const target = within ? el.querySelector(within) : el;
+            if (target) return target.innerText || target.textContent || '';
+        }
+        return null;
+    };
+    const out = {};
+    for (const [metric, selectors] of Object.entries(plan)) out[metric] = selectors.map(first);
+    return out;
+}"""
+
+
+class CompiledSelector(NamedTuple):
+    """
+    A settings.json selector in a form the page can run without Playwright's engine.
+    `span:has-text('views')` becomes css='span' with a case-insensitive text filter;
+    `within` is a descendant selector applied under the text-filtered element.
+    """
+    raw: str
+    css: str
+    text: Optional[str]
+    within: Optional[str]
+
+
+def compile_selector(selector: str) -> Optional[CompiledSelector]:
+    """Translate one selector, or return None if it uses syntax we can't run in-page."""
+    if any(token in selector for token in UNSUPPORTED_SYNTAX):
+        return None
+    match = HAS_TEXT_RE.match(selector.strip())
+    if not match:
+        return CompiledSelector(selector, selector, None, None)
+
+    css = match.group('css').strip() or '*'
+    rest = match.group('rest')
+    # Anything glued to the pseudo-class (':has-text("x").cls') has no CSS equivalent
+    if ':has-text(' in rest or (rest and not rest[0].isspace() and rest[0] not in '>+~'):
+        return None
+    within = rest.strip() or None
+    if within and within[0] in '>+~':
+        # Child/sibling combinators need a subject; :scope keeps them relative to the match
+        if within[0] != '>':
+            return None
+        within = f':scope {within}'
+    # Playwright's :has-text is case-insensitive and collapses whitespace
+    text = ' '.join(match.group('text').split()).lower()
+    return CompiledSelector(selector, css, text, within)
+
+
+class DomExtractor:
+    """
+    Reads metrics from the DOM using the platform's configured selectors.
+    Selectors are compiled once, when the scraper is created; each page then
+    gets a single page.evaluate for all metrics instead of a query_selector and
+    inner_text round trip per selector. Fallback order is unchanged: for each
+    metric, the first selector (in settings.json order) whose text parses to a
+    positive number wins.
+    """
+
+    def __init__(self, selectors: Dict[str, List[str]], locale: str = 'auto'):
+        self.grammar = get_grammar(locale)
+        self.plan: Dict[str, List[dict]] = {}
+        for metric, raw_selectors in selectors.items():
+            compiled = []
+            for raw in raw_selectors:
+                selector = compile_selector(raw)
+                if selector is None:
+                    logger.warning(f"Skipping {metric} selector {raw!r}: not supported in page-side probing")
+                    continue
+                compiled.append(selector._asdict())
+            self.plan[metric] = compiled
+
+    async def probe(self, page, metrics: List[str] = None) -> Dict[str, List[Optional[str]]]:
+        """Text found by each selector of each requested metric, in configured order."""
+        plan = {metric: self.plan.get(metric, []) for metric in (metrics or self.plan)}
+        if not any(plan.values()):
+            return {metric: [] for metric in plan}
+        return await page.evaluate(PROBE_JS, plan)
+
+    async def extract(self, page, metrics: List[str] = None) -> Dict[str, int]:
+        """{metric: value} using the first selector whose text is a positive count (0 if none)."""
+        found = await self.probe(page, metrics)
+        # Every text the page returned, parsed in one batch call
+        texts = [text for texts in found.values() for text in texts if text]
+        parsed = dict(zip(texts, self.grammar.parse_batch(texts)))
+        values = {}
+        for metric, texts in found.items():
+            values[metric] = 0
+            for text in texts:
+                if not text:
+                    continue
+                result = parsed[text]
+                if not result.ok:
+                    logger.debug(f"Unreadable {metric} text {text!r}: {result.error}")
+                    continue
+                logger.debug(f"Found {metric} text: {text}")
+                if result.value > 0:
+                    values[metric] = result.value
+                    break
+        return values
@@ -1,160 +1,221 @@
 from .base_scraper import BaseScraper
-from ..utils.normalization import normalize_metric
+from ..utils.normalization import parse_metrics
 from ..services.logger import setup_logger
-from datetime import datetime
+from ..services.http_client import get_http_client
+from typing import Tuple
+import html
 import json
 import re
-import os
 
 logger = setup_logger('instagram_scraper')
 
+LD_JSON_RE = re.compile(r'<script[^>]+type="application/ld\+json"[^>]*>(.*?)</script>', re.DOTALL)
+META_DESC_RE = re.compile(r'<meta[^>]+name="description"[^>]+content="([^"]*)"', re.IGNORECASE)
+
+
+def parse_ld_json(data) -> Tuple[int, int]:
+    """Read (views, likes) from the interactionStatistic entries of a JSON-LD document."""
+    views = 0
+    likes = 0
+
+    # Graph can be a list or dict
+    items = data if isinstance(data, list) else [data]
+
+    for item in items:
+        # Look for interactionStatistic
+        stats = item.get('interactionStatistic', [])
+        if isinstance(stats, dict): stats = [stats]
+
+        for stat in stats:
+            itype = stat.get('interactionType', '')
+            count = stat.get('userInteractionCount', 0)
+
+            if 'WatchAction' in itype or 'ViewAction' in itype:
+                views = int(count) if count else views
+            elif 'LikeAction' in itype:
+                likes = int(count) if count else likes
+
+    return views, likes
+
+
+def parse_meta_description(meta_desc: str) -> Tuple[int, int]:
+    """Read (views, likes) from a meta description such as '1.2M likes, 340 comments - ...'."""
+    # Pattern: "1.2M views" or "1234 views" or "Play count: 1.2M" or "1.2M plays"
+    views_match = re.search(r'([\d,.]+[KMB]?)\s*(?:views|plays|count)', meta_desc, re.IGNORECASE)
+    likes_match = re.search(r'([\d,.]+[KMB]?)\s*likes', meta_desc, re.IGNORECASE)
+
+    # Both counts in one batch call; a missing or unreadable count is 0
+    texts = [match.group(1) if match else None for match in (views_match, likes_match)]
+    views, likes = (result.value if result.ok else 0 for result in parse_metrics(texts))
+    return views, likes
+
+
+def parse_html(page_html: str) -> Tuple[int, int]:
+    """JSON-LD then meta description, straight from raw page HTML."""
+    views = 0
+    likes = 0
+
+    match = LD_JSON_RE.search(page_html)
+    if match:
+        try:
+            views, likes = parse_ld_json(json.loads(match.group(1)))
+        except ValueError as e:
+            logger.debug(f"JSON-LD in HTML response was not valid JSON: {e}")
+
+    if views == 0 or likes == 0:
+        match = META_DESC_RE.search(page_html)
+        if match:
+            meta_views, meta_likes = parse_meta_description(html.unescape(match.group(1)))
+            views = views or meta_views
+            likes = likes or meta_likes
+
+    return views, likes
+
 class InstagramScraper(BaseScraper):
+    platform = 'instagram'
+
     async def scrape(self, url: str) -> dict:
-        if not self.context:
-            await self.start_browser(headless=self.scraping_ops['headless'])
+        # Tier 1: plain HTTP fetch; most public reels carry JSON-LD/meta in the initial HTML
+        if self.platform_config.get('http_first', True):
+            with self.metrics.time('http_fetch', self.platform):
+                result = await self._scrape_http(url)
+            if result:
+                self.record_strategy('http')
+                return result
 
+        # Tier 2: full browser
         try:
-            logger.info(f"Navigating to {url}")
-            await self.page.goto(url, timeout=self.config['platforms']['instagram']['timeout'])
-            await self.human_delay()
-            
-            # Check for login wall
-            if "login" in self.page.url:
-                logger.warning("Redirected to login page. Metrics might be hidden.")
-            
-            # Check for generic Instagram error
-            try:
-                error_elem = await self.page.query_selector('div:has-text("Sorry, we\'re having trouble playing this video")')
-                if error_elem:
-                     logger.error("Instagram Error: 'Trouble playing this video'. Likely IP/Bot detection.")
-                     return {'views': 0, 'likes': 0, 'error': "INSTAGRAM_PLAYBACK_ERROR"}
-            except:
-                pass
-
-            views = 0
-            likes = 0
-            
-            # --- STRATEGY 1: JSON-LD (Structured Data) ---
-            # Most reliable source if present
-            try:
-                # Instagram often includes a script tag with JSON-LD
-                ld_json = await self.page.query_selector('script[type="application/ld+json"]')
-                if ld_json:
-                    json_text = await ld_json.inner_text()
-                    data = json.loads(json_text)
-                    logger.debug(f"Found JSON-LD: {str(data)[:200]}...") # Log start
-                    
-                    # Graph can be a list or dict
-                    items = data if isinstance(data, list) else [data]
-                    
-                    for item in items:
-                        # Look for interactionStatistic
-                        stats = item.get('interactionStatistic', [])
-                        if isinstance(stats, dict): stats = [stats]
-                        
-                        for stat in stats:
-                            itype = stat.get('interactionType', '')
-                            count = stat.get('userInteractionCount', 0)
-                            
-                            if 'WatchAction' in itype or 'ViewAction' in itype:
-                                views = int(count) if count else views
-                            elif 'LikeAction' in itype:
-                                likes = int(count) if count else likes
-                    
-                    if views > 0 or likes > 0:
-                        logger.info(f"Extracted from JSON-LD: views={views}, likes={likes}")
-            except Exception as e:
-                logger.debug(f"JSON-LD extraction failed: {e}")
-
-            # --- STRATEGY 2: Meta Tags (Fallback) ---
-            if views == 0 or likes == 0:
-                try:
-                    meta_desc = await self.page.get_attribute('meta[name="description"]', 'content')
-                    if meta_desc:
-                        logger.debug(f"Found meta description: {meta_desc}")
-                        
-                        # Try to find Views
-                        # Pattern: "1.2M views" or "1234 views" or "Play count: 1.2M" or "1.2M plays"
-                        if views == 0:
-                            views_match = re.search(r'([\d,.]+[KMB]?)\s*(?:views|plays|count)', meta_desc, re.IGNORECASE)
-                            if views_match:
-                                 views = normalize_metric(views_match.group(1))
-
-                        # Try to find Likes
-                        if likes == 0:
-                            likes_match = re.search(r'([\d,.]+[KMB]?)\s*likes', meta_desc, re.IGNORECASE)
-                            if likes_match:
-                                 likes = normalize_metric(likes_match.group(1))
-                             
-                        logger.debug(f"Extracted from meta: views={views}, likes={likes}")
-                except Exception as e:
-                    logger.warning(f"Meta extraction failed: {e}")
-
-            # If still 0, try DOM selectors (DOM usually more accurate for real-time if visible)
-            if views == 0:
-                cfg_selectors = self.config['platforms']['instagram']['selectors']
-                content = await self.page.content()
-                
-                for selector in cfg_selectors['views']:
-                    try:
-                        elem = await self.page.query_selector(selector)
-                        if elem:
-                            text = await elem.inner_text()
-                            logger.debug(f"Found views text: {text}")
-                            v = normalize_metric(text)
-                            if v > 0:
-                                views = v
-                                break
-                    except Exception:
-                        continue
-            
-            if likes == 0:
-                cfg_selectors = self.config['platforms']['instagram']['selectors']
-                for selector in cfg_selectors['likes']:
-                    try:
-                        elem = await self.page.query_selector(selector)
-                        if elem:
-                            text = await elem.inner_text()
-                            logger.debug(f"Found likes text: {text}")
-                            if any(c.isdigit() for c in text):
-                                l = normalize_metric(text)
-                                if l > 0:
-                                    likes = l
-                                    break
-                    except Exception:
-                        continue
-            
-            # --- DEBUG SNAPSHOT IF FAILED ---
-            if views == 0 and likes == 0:
-                logger.warning(f"Zero metrics found for {url}. Taking debug snapshot.")
-                timestamp = int(datetime.now().timestamp())
-                debug_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'logs', 'debug')
-                os.makedirs(debug_dir, exist_ok=True)
-                
-                screenshot_path = os.path.join(debug_dir, f"fail_insta_{timestamp}.png")
-                html_path = os.path.join(debug_dir, f"fail_insta_{timestamp}.html")
-                
-                try:
-                    await self.page.screenshot(path=screenshot_path)
-                    with open(html_path, 'w', encoding='utf-8') as f:
-                        f.write(await self.page.content())
-                    logger.info(f"Saved debug snapshot to {screenshot_path}")
-                except Exception as e:
-                    logger.error(f"Failed to save debug snapshot: {e}")
-            # --------------------------------
-
-            logger.info(f"Scraped: {views} views, {likes} likes")
-            
-            return {
-                'views': views,
-                'likes': likes,
-                'error': None
-            }
+            await self.ensure_browser()
+            async with self.lease_page() as page:
+                return await self._scrape_page(page, url)
 
         except Exception as e:
             logger.error(f"Instagram scrape failed: {e}")
+            self.report_error(e)
             return {
                 'views': 0,
                 'likes': 0,
-                'error': str(e)
+                'error': str(e),
+                'error_class': type(e).__name__
             }
+
+    async def _scrape_http(self, url: str):
+        """Fetch the page without a browser. Returns None to hand the URL to Playwright."""
+        try:
+            client = get_http_client(self.scraping_ops, self._get_cookies_path())
+            await self.rate_limiter.acquire()
+            response = await client.get(self.target_url(url))
+            if response.status_code != 200 or 'login' in response.url.path:
+                logger.debug(f"HTTP fetch not usable (status {response.status_code}, {response.url}); using browser")
+                return None
+            views, likes = parse_html(response.text)
+        except Exception as e:
+            logger.debug(f"HTTP fetch failed for {url}: {e}")
+            return None
+
+        if views == 0 and likes == 0:
+            return None
+        self.rate_limiter.record_success()
+        logger.info(f"Scraped over HTTP: {views} views, {likes} likes")
+        return {'views': views, 'likes': likes, 'error': None}
+
+    async def close(self):
+        if self.strategy_hits:
+            logger.info(f"Instagram extraction strategies: {dict(self.strategy_hits)}")
+        await super().close()
+
+    async def _scrape_page(self, page, url: str) -> dict:
+        logger.info(f"Navigating to {url}")
+        await self.navigate(page, url)
+        
+        # Check for login wall
+        login_wall = "login" in page.url
+        if login_wall:
+            logger.warning("Redirected to login page. Metrics might be hidden.")
+            self.rate_limiter.record_throttle('login_redirect')
+        
+        # Check for generic Instagram error
+        try:
+            error_elem = await page.query_selector('div:has-text("Sorry, we\'re having trouble playing this video")')
+            if error_elem:
+                 logger.error("Instagram Error: 'Trouble playing this video'. Likely IP/Bot detection.")
+                 self.rate_limiter.record_throttle('playback_error')
+                 return {'views': 0, 'likes': 0, 'error': "INSTAGRAM_PLAYBACK_ERROR"}
+        except:
+            pass
+
+        views = 0
+        likes = 0
+        # First strategy that found a number, for the hit-rate counters
+        strategy = 'none'
+        
+        # --- STRATEGY 1: JSON-LD (Structured Data) ---
+        # Most reliable source if present
+        try:
+            # Instagram often includes a script tag with JSON-LD
+            ld_json = await page.query_selector('script[type="application/ld+json"]')
+            if ld_json:
+                json_text = await ld_json.inner_text()
+                data = json.loads(json_text)
+                logger.debug(f"Found JSON-LD: {str(data)[:200]}...") # Log start
+                
+                views, likes = parse_ld_json(data)
+
+                if views > 0 or likes > 0:
+                    strategy = 'json_ld'
+                    logger.info(f"Extracted from JSON-LD: views={views}, likes={likes}")
+        except Exception as e:
+            logger.debug(f"JSON-LD extraction failed: {e}")
+
+        # --- STRATEGY 2: Meta Tags (Fallback) ---
+        if views == 0 or likes == 0:
+            try:
+                meta_desc = await page.get_attribute('meta[name="description"]', 'content')
+                if meta_desc:
+                    logger.debug(f"Found meta description: {meta_desc}")
+                    
+                    meta_views, meta_likes = parse_meta_description(meta_desc)
+                    views = views or meta_views
+                    likes = likes or meta_likes
+                    if strategy == 'none' and (views > 0 or likes > 0):
+                        strategy = 'meta'
+
+                    logger.debug(f"Extracted from meta: views={views}, likes={likes}")
+            except Exception as e:
+                logger.warning(f"Meta extraction failed: {e}")
+
+        # If still 0, try DOM selectors (DOM usually more accurate for real-time if visible)
+        missing = [metric for metric, value in (('views', views), ('likes', likes)) if value == 0]
+        if missing:
+            try:
+                # Every selector for every missing metric in one evaluate call
+                with self.metrics.time('selectors', self.platform):
+                    found = await self.dom_extractor.extract(page, missing)
+                views = views or found.get('views', 0)
+                likes = likes or found.get('likes', 0)
+            except Exception as e:
+                logger.warning(f"DOM extraction failed: {e}")
+        if strategy == 'none' and (views > 0 or likes > 0):
+            strategy = 'dom'
+        
+        # --- DEBUG SNAPSHOT IF FAILED (sampled; written in the background) ---
+        if views == 0 and likes == 0:
+            logger.warning(f"Zero metrics found for {url}.")
+            await self.diagnostics.capture(page, self.platform, url, 'zero_metrics')
+            if login_wall:
+                # Hidden behind the wall, not really zero; reported as an error so it can be retried
+                self.record_strategy(strategy)
+                return {'views': 0, 'likes': 0, 'error': "INSTAGRAM_LOGIN_WALL"}
+
+        self.record_strategy(strategy)
+        if views > 0 or likes > 0:
+            self.rate_limiter.record_success()
+
+        logger.info(f"Scraped: {views} views, {likes} likes")
+        
+        return {
+            'views': views,
+            'likes': likes,
+            'error': None
+        }
+
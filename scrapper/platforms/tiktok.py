@@ -1,63 +1,137 @@
 from .base_scraper import BaseScraper
-from ..utils.normalization import normalize_metric
 from ..services.logger import setup_logger
+from typing import Optional
+import json
 
 logger = setup_logger('tiktok_scraper')
 
+CAPTCHA_SELECTOR = "#captcha-verify-image, div[class*='captcha']"
+
+# Hydration blobs TikTok embeds in the initial HTML; newest layout first
+HYDRATION_SCRIPT_IDS = ('__UNIVERSAL_DATA_FOR_REHYDRATION__', 'SIGI_STATE')
+
+READ_HYDRATION_JS = """(ids) => {
+    for (const id of ids) {
+        const el = document.getElementById(id);
+        if (el && el.textContent) return el.textContent;
+    }
+    return null;
+}"""
+
+
+def parse_hydration_stats(blob: str) -> Optional[dict]:
+    """
+    Pull play/like/comment/share counts out of a TikTok hydration JSON blob.
+    Returns None if the blob doesn't contain video stats.
+    """
+    try:
+        data = json.loads(blob)
+    except (TypeError, ValueError):
+        return None
+
+    stats = None
+    # __UNIVERSAL_DATA_FOR_REHYDRATION__ layout
+    detail = data.get('__DEFAULT_SCOPE__', {}).get('webapp.video-detail', {})
+    item = detail.get('itemInfo', {}).get('itemStruct', {})
+    if item:
+        stats = item.get('statsV2') or item.get('stats')
+    # Older SIGI_STATE layout: ItemModule keyed by video id
+    if not stats:
+        for module_item in data.get('ItemModule', {}).values():
+            stats = module_item.get('stats')
+            if stats:
+                break
+    if not stats:
+        return None
+
+    def count(key):
+        # statsV2 holds counts as strings to survive values past 2^53
+        try:
+            return int(stats.get(key) or 0)
+        except (TypeError, ValueError):
+            return 0
+
+    return {
+        'views': count('playCount'),
+        'likes': count('diggCount'),
+        'comments': count('commentCount'),
+        'shares': count('shareCount'),
+    }
+
 class TikTokScraper(BaseScraper):
-    async def scrape(self, url: str) -> dict:
-        if not self.context:
-            await self.start_browser(headless=self.scraping_ops['headless'])
+    platform = 'tiktok'
 
+    async def scrape(self, url: str) -> dict:
         try:
-            logger.info(f"Navigating to {url}")
-            await self.page.goto(url, timeout=self.config['platforms']['tiktok']['timeout'])
-            await self.human_delay()
-            
-            # TikTok often has a captcha or login, hard to bypass fully without stealth
-            # But for public videos, it often works.
-            
-            views = 0
-            likes = 0
-            
-            selectors = self.config['platforms']['tiktok']['selectors']
-            
-            # Extract Views
-            for selector in selectors['views']:
-                try:
-                    elem = await self.page.query_selector(selector)
-                    if elem:
-                        text = await elem.inner_text()
-                        logger.debug(f"Found views text: {text}")
-                        views = normalize_metric(text)
-                        if views > 0: break
-                except Exception:
-                    continue
-                    
-            # Extract Likes
-            for selector in selectors['likes']:
-                try:
-                    elem = await self.page.query_selector(selector)
-                    if elem:
-                        text = await elem.inner_text()
-                        logger.debug(f"Found likes text: {text}")
-                        likes = normalize_metric(text)
-                        if likes > 0: break
-                except Exception:
-                    continue
-            
-            logger.info(f"Scraped: {views} views, {likes} likes")
-            
-            return {
-                'views': views,
-                'likes': likes,
-                'error': None
-            }
+            await self.ensure_browser()
+            async with self.lease_page() as page:
+                return await self._scrape_page(page, url)
 
         except Exception as e:
             logger.error(f"TikTok scrape failed: {e}")
+            self.report_error(e)
             return {
                 'views': 0,
                 'likes': 0,
-                'error': str(e)
+                'error': str(e),
+                'error_class': type(e).__name__
             }
+
+    async def _scrape_page(self, page, url: str) -> dict:
+        logger.info(f"Navigating to {url}")
+        await self.navigate(page, url)
+        
+        # TikTok often has a captcha or login, hard to bypass fully without stealth
+        # But for public videos, it often works.
+        captcha = await page.query_selector(CAPTCHA_SELECTOR)
+        if captcha:
+            logger.warning("Captcha shown. Metrics might be hidden.")
+            self.rate_limiter.record_throttle('captcha')
+        
+        # --- STRATEGY 1: Hydration JSON (one evaluate call for every metric) ---
+        try:
+            with self.metrics.time('hydration', self.platform):
+                stats = parse_hydration_stats(await page.evaluate(READ_HYDRATION_JS, list(HYDRATION_SCRIPT_IDS)))
+        except Exception as e:
+            logger.debug(f"Hydration JSON extraction failed: {e}")
+            stats = None
+
+        if stats and (stats['views'] > 0 or stats['likes'] > 0):
+            self.record_strategy('hydration')
+            self.rate_limiter.record_success()
+            logger.info(f"Scraped from hydration JSON: {stats['views']} views, {stats['likes']} likes")
+            return {**stats, 'error': None}
+
+        # --- STRATEGY 2: DOM selectors (fallback, one evaluate call for every selector) ---
+        views = 0
+        likes = 0
+        
+        try:
+            with self.metrics.time('selectors', self.platform):
+                found = await self.dom_extractor.extract(page, ['views', 'likes'])
+            views = found['views']
+            likes = found['likes']
+        except Exception as e:
+            logger.warning(f"DOM extraction failed: {e}")
+        
+        if views > 0 or likes > 0:
+            self.record_strategy('dom')
+            self.rate_limiter.record_success()
+        else:
+            self.record_strategy('none')
+            if captcha:
+                # The captcha hid the counts; reported as an error so it can be retried
+                return {'views': 0, 'likes': 0, 'error': "TIKTOK_CAPTCHA"}
+
+        logger.info(f"Scraped: {views} views, {likes} likes")
+        
+        return {
+            'views': views,
+            'likes': likes,
+            'error': None
+        }
+
+    async def close(self):
+        if self.strategy_hits:
+            logger.info(f"TikTok extraction strategies: {dict(self.strategy_hits)}")
+        await super().close()
@@ -1,47 +1,159 @@
 from .base_scraper import BaseScraper
-import yt_dlp
+from .youtube_api import YouTubeDataAPI, build_batcher
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional
+import asyncio
+import threading
+import time
 from ..services.logger import setup_logger
+from ..utils.url_parser import parse_url
 
 logger = setup_logger('youtube_scraper')
 
+# We only read view_count/like_count, so skip format resolution and player JS
+YDL_OPTS = {
+    'quiet': True,
+    'skip_download': True,
+    'no_warnings': True,
+    'extractor_args': {'youtube': {
+        'player_skip': ['js'],
+        'skip': ['dash', 'hls', 'translated_subs'],
+    }},
+}
+
 class YouTubeScraper(BaseScraper):
+    platform = 'youtube'
+    uses_browser = False
+
+    def __init__(self, config: dict):
+        super().__init__(config)
+        # Dedicated pool so yt-dlp work is bounded by our own limit, not the loop's default executor
+        self.executor = ThreadPoolExecutor(max_workers=self.configured_concurrency,
+                                           thread_name_prefix='yt-dlp')
+        # One long-lived YoutubeDL per worker thread; building one per URL is expensive
+        self._thread_state = threading.local()
+        self._instances = []
+        # Optional Data API backend; yt-dlp stays the fallback
+        self.api_batcher = build_batcher(self.platform_config)
+
+    @property
+    def max_concurrency(self) -> int:
+        # API lookups mostly wait on a shared batch, so let enough in to fill one;
+        # yt-dlp fallbacks are still capped by the executor size
+        if self.api_batcher:
+            return max(self.configured_concurrency, YouTubeDataAPI.MAX_IDS)
+        return self.configured_concurrency
+
+    @property
+    def batch_size(self) -> int:
+        # Rows the pipeline hands to scrape_batch() together (platforms.youtube.batch_size)
+        return max(1, int(self.platform_config.get('batch_size', 2 * self.configured_concurrency)))
+
     async def scrape(self, url: str) -> dict:
         """
         Scrape YouTube metrics using yt-dlp (reliable api-like).
         Fallback to browser if needed (not implemented yet as yt-dlp is very robust).
         """
         logger.info(f"Scraping YouTube URL: {url}")
-        
-        ydl_opts = {
-            'quiet': True,
-            'skip_download': True,
-            'forcejson': True,
-            'no_warnings': True
-        }
 
+        parsed = parse_url(url)
+        if self.api_batcher and parsed:
+            result = await self._api_lookup(parsed.video_id)
+            if result:
+                return result
+        return (await self._scrape_ytdlp([url]))[0]
+
+    async def scrape_batch(self, video_ids: Iterable[str]) -> Dict[str, dict]:
+        """
+        Scrape a list of videos in one call: {video_id: result}, each result
+        shaped like scrape()'s. Videos the Data API answers (when enabled) skip
+        yt-dlp; the rest go to the yt-dlp threads together, each thread reusing
+        its own YoutubeDL.
+        """
+        video_ids = list(dict.fromkeys(video_ids))
+        results = {}
+        if self.api_batcher:
+            # Concurrent lookups coalesce into as few videos.list calls as possible
+            found = await asyncio.gather(*(self._api_lookup(video_id) for video_id in video_ids))
+            results = {video_id: result for video_id, result in zip(video_ids, found) if result}
+
+        remaining = [video_id for video_id in video_ids if video_id not in results]
+        if remaining:
+            logger.info(f"Scraping {len(remaining)} YouTube videos with yt-dlp")
+            urls = [f'https://www.youtube.com/watch?v={video_id}' for video_id in remaining]
+            results.update(zip(remaining, await self._scrape_ytdlp(urls)))
+        return results
+
+    async def _api_lookup(self, video_id: str) -> Optional[dict]:
+        """Result from the Data API, or None to fall back to yt-dlp."""
         try:
-            # yt-dlp is sync, but fast enough. For strict async we could use asyncio.to_thread
-            info = await asyncio.to_thread(self._run_ytdlp, url, ydl_opts)
-                
-            views = info.get('view_count', 0)
-            likes = info.get('like_count', 0)
-            
+            with self.metrics.time('api', self.platform):
+                stats = await self.api_batcher.get(video_id)
+        except Exception as e:
+            logger.warning(f"YouTube API lookup failed for {video_id}: {e}")
+            return None
+        if not stats:
+            return None
+        logger.info(f"Found {stats['views']} views, {stats['likes']} likes (Data API)")
+        self.record_strategy('api')
+        return {**stats, 'error': None}
+
+    async def _scrape_ytdlp(self, urls: List[str]) -> List[dict]:
+        """Run yt-dlp for every URL at once on the worker threads; results in input order."""
+        # yt-dlp is sync, so run it on the worker threads
+        loop = asyncio.get_running_loop()
+        infos = await asyncio.gather(*(loop.run_in_executor(self.executor, self._run_ytdlp, url) for url in urls),
+                                     return_exceptions=True)
+        results = []
+        for info in infos:
+            if isinstance(info, Exception):
+                logger.error(f"YouTube scrape failed: {info}")
+                results.append({
+                    'views': 0,
+                    'likes': 0,
+                    'error': str(info),
+                    'error_class': type(info).__name__
+                })
+                continue
+
+            views = info.get('view_count') or 0
+            likes = info.get('like_count') or 0
             logger.info(f"Found {views} views, {likes} likes")
-            
-            return {
+            self.record_strategy('ytdlp')
+            results.append({
                 'views': views,
                 'likes': likes,
                 'error': None
-            }
-            
-        except Exception as e:
-            logger.error(f"YouTube scrape failed: {e}")
-            return {
-                'views': 0,
-                'likes': 0,
-                'error': str(e)
-            }
-
-    def _run_ytdlp(self, url, opts):
-        with yt_dlp.YoutubeDL(opts) as ydl:
-            return ydl.extract_info(url, download=False)
+            })
+        return results
+
+    async def close(self):
+        ytdlp = self.metrics.stage('ytdlp', self.platform)
+        if ytdlp:
+            logger.info(f"yt-dlp: {ytdlp['count']} URLs on {self.configured_concurrency} threads, "
+                        f"p50 <= {ytdlp['p50']}s, p95 <= {ytdlp['p95']}s")
+        if self.api_batcher:
+            self.api_batcher.close()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        for ydl in self._instances:
+            ydl.close()
+        await super().close()
+
+    def _get_ydl(self):
+        ydl = getattr(self._thread_state, 'ydl', None)
+        if ydl is None:
+            # Imported on first use; runs answered by the Data API never load yt-dlp
+            import yt_dlp
+
+            ydl = yt_dlp.YoutubeDL(YDL_OPTS)
+            self._thread_state.ydl = ydl
+            self._instances.append(ydl)
+        return ydl
+
+    def _run_ytdlp(self, url):
+        started = time.monotonic()
+        try:
+            # process=False stops before format selection; counters are already in the raw info
+            return self._get_ydl().extract_info(url, download=False, process=False)
+        finally:
+            self.metrics.observe('ytdlp', self.platform, time.monotonic() - started)
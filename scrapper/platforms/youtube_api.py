@@ -0,0 +1,129 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Optional
+import asyncio
+import os
+from ..services.logger import setup_logger
+
+logger = setup_logger('youtube_api')
+
+class YouTubeDataAPI:
+    """
+    Thin client for videos.list?part=statistics in chunks of 50 IDs.
+    Each call costs one quota unit; once the configured quota is spent, or the
+    API reports quotaExceeded, the client stops answering so callers fall back.
+    """
+    MAX_IDS = 50
+
+    def __init__(self, api_key: str, api_endpoint: Optional[str] = None, daily_quota: int = 10000):
+        # Imported lazily so runs without the API never pay for googleapiclient
+        from googleapiclient.discovery import build
+
+        # api_endpoint lets tests point the client at a local stub server
+        client_options = {'api_endpoint': api_endpoint} if api_endpoint else None
+        self.service = build('youtube', 'v3', developerKey=api_key, client_options=client_options,
+                             static_discovery=True, cache_discovery=False)
+        self.daily_quota = daily_quota
+        self.quota_used = 0
+        self.calls = 0
+        self.exhausted = False
+
+    def fetch_statistics(self, video_ids: Iterable[str]) -> Dict[str, dict]:
+        """Return {video_id: {'views', 'likes', 'comments'}} for the IDs the API could answer."""
+        from googleapiclient.errors import HttpError
+
+        video_ids = list(video_ids)
+        results = {}
+        for start in range(0, len(video_ids), self.MAX_IDS):
+            if self.exhausted or self.quota_used >= self.daily_quota:
+                self.exhausted = True
+                break
+            chunk = video_ids[start:start + self.MAX_IDS]
+            try:
+                response = self.service.videos().list(part='statistics', id=','.join(chunk),
+                                                      maxResults=self.MAX_IDS).execute()
+            except HttpError as e:
+                if e.resp.status == 403 and 'quota' in str(e).lower():
+                    logger.warning("YouTube API quota exceeded; falling back to yt-dlp")
+                    self.exhausted = True
+                    break
+                raise
+            finally:
+                self.calls += 1
+                self.quota_used += 1
+
+            for item in response.get('items', []):
+                stats = item.get('statistics', {})
+                if 'viewCount' not in stats:
+                    continue
+                results[item['id']] = {
+                    'views': int(stats.get('viewCount', 0)),
+                    # likeCount is absent when the owner hides likes
+                    'likes': int(stats.get('likeCount', 0)),
+                    'comments': int(stats.get('commentCount', 0)),
+                }
+        return results
+
+
+class StatisticsBatcher:
+    """
+    Coalesces single-video lookups from concurrent scrape() calls into
+    50-ID API requests. A lookup waits at most `window` seconds for others
+    to join its batch; a full batch is sent immediately.
+    """
+
+    def __init__(self, api: YouTubeDataAPI, window: float = 0.5):
+        self.api = api
+        self.window = window
+        # googleapiclient's HTTP transport is not thread-safe, so keep it on one thread
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='youtube-api')
+        self._waiting: Dict[str, list] = {}
+        self._timer = None
+
+    async def get(self, video_id: str) -> Optional[dict]:
+        """Statistics for one video, or None if the API couldn't answer it."""
+        if self.api.exhausted:
+            return None
+        future = asyncio.get_running_loop().create_future()
+        self._waiting.setdefault(video_id, []).append(future)
+        if len(self._waiting) >= YouTubeDataAPI.MAX_IDS:
+            self._flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._waiting = self._waiting, {}
+        if batch:
+            asyncio.ensure_future(self._send(batch))
+
+    async def _send(self, batch: Dict[str, list]):
+        loop = asyncio.get_running_loop()
+        try:
+            results = await loop.run_in_executor(self.executor, self.api.fetch_statistics, list(batch))
+        except Exception as e:
+            logger.error(f"YouTube API batch of {len(batch)} failed: {e}")
+            results = {}
+        for video_id, futures in batch.items():
+            for future in futures:
+                if not future.done():
+                    future.set_result(results.get(video_id))
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        logger.info(f"YouTube API: {self.api.calls} calls, {self.api.quota_used}/{self.api.daily_quota} quota units")
+
+
+def build_batcher(platform_config: dict) -> Optional[StatisticsBatcher]:
+    """StatisticsBatcher from platforms.youtube.api, or None when the API is disabled."""
+    api_cfg = platform_config.get('api', {})
+    if not api_cfg.get('enabled', False):
+        return None
+    api_key = api_cfg.get('api_key') or os.environ.get('YOUTUBE_API_KEY')
+    if not api_key:
+        logger.warning("YouTube API enabled but no api_key or YOUTUBE_API_KEY set; using yt-dlp only")
+        return None
+    api = YouTubeDataAPI(api_key, api_cfg.get('api_endpoint'), api_cfg.get('daily_quota', 10000))
+    return StatisticsBatcher(api, api_cfg.get('batch_window_seconds', 0.5))
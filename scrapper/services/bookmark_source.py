@@ -0,0 +1,214 @@
+from collections import deque
+from datetime import datetime
+from html.parser import HTMLParser
+from typing import Any, AsyncIterator, Dict, Iterator, List, NamedTuple
+import asyncio
+import json
+import os
+import threading
+import time
+from .logger import setup_logger
+from .sheet_service import SheetRow
+from ..utils.url_parser import is_short_link, parse_url
+
+logger = setup_logger('bookmark_source')
+
+READ_CHUNK = 64 * 1024
+
+
+class Bookmark(NamedTuple):
+    url: str
+    title: str
+    folder: str
+
+
+class BookmarkParser(HTMLParser):
+    """
+    Incremental parser for Netscape bookmark files (what every browser exports).
+    feed() it chunks and drain `found` between them; only the current tag and
+    folder path are ever held, so memory stays flat however big the file is.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.found = deque()
+        self._folders = []
+        self._pending_folder = None
+        self._href = None
+        self._text = []
+        self._in_folder_title = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'a':
+            self._href = dict(attrs).get('href')
+            self._text = []
+        elif tag == 'h3':
+            self._in_folder_title = True
+            self._text = []
+        elif tag == 'dl':
+            # A <DL> right after an <H3> holds that folder's entries
+            self._folders.append(self._pending_folder or '')
+            self._pending_folder = None
+
+    def handle_endtag(self, tag):
+        if tag == 'a' and self._href is not None:
+            title = ' '.join(''.join(self._text).split())
+            self.found.append(Bookmark(self._href, title, '/'.join(f for f in self._folders if f)))
+            self._href = None
+        elif tag == 'h3':
+            self._pending_folder = ' '.join(''.join(self._text).split())
+            self._in_folder_title = False
+        elif tag == 'dl' and self._folders:
+            self._folders.pop()
+
+    def handle_data(self, data):
+        if self._href is not None or self._in_folder_title:
+            self._text.append(data)
+
+
+def iter_bookmarks(path: str) -> Iterator[Bookmark]:
+    """Every link in a bookmark file, in file order, read READ_CHUNK bytes at a time."""
+    parser = BookmarkParser()
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        while True:
+            chunk = f.read(READ_CHUNK)
+            if not chunk:
+                break
+            parser.feed(chunk)
+            while parser.found:
+                yield parser.found.popleft()
+    parser.close()
+    while parser.found:
+        yield parser.found.popleft()
+
+
+class BookmarkFileClient:
+    """
+    Stand-in for GoogleSheetClient that reads video links from an exported
+    bookmarks file and writes results to a local JSON Lines file, so the same
+    ScrapePipeline, scheduler, cache and journal run without Google Sheets.
+
+    Links are canonicalized and deduplicated by platform and video ID
+    (short links by their URL until they are resolved); links that aren't
+    Instagram, TikTok or YouTube videos are skipped. Each kept link becomes
+    a row numbered by its position among kept links, which stays stable
+    across runs of the same file, so --resume works.
+    """
+
+    def __init__(self, bookmarks_path: str, output_path: str, page_size: int = 500,
+                 flush_seconds: float = 15, resume: bool = False):
+        self.bookmarks_path = bookmarks_path
+        self.output_path = output_path
+        self.resume = resume
+        self.page_size = page_size
+        self.flush_seconds = flush_seconds
+        # Mirrors GoogleSheetClient so main.py can treat both alike
+        self.headers = {}
+        self.api_calls = 0
+        self.on_flush = None
+        self.skipped = 0
+        self.duplicates = 0
+        # Rows handed to the pipeline but not written yet: row_num -> Bookmark
+        self._open_rows: Dict[int, Bookmark] = {}
+        self._pending: Dict[int, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+
+    def connect(self):
+        if not os.path.exists(self.bookmarks_path):
+            raise FileNotFoundError(f"Bookmarks file not found: {self.bookmarks_path}")
+        os.makedirs(os.path.dirname(self.output_path), exist_ok=True)
+        if not self.resume and os.path.exists(self.output_path):
+            # New run: keep the previous results next to the new ones, like RunJournal does
+            os.replace(self.output_path, self.output_path + '.prev')
+
+    def _iter_rows(self) -> Iterator[SheetRow]:
+        seen = set()
+        row_num = 0
+        for bookmark in iter_bookmarks(self.bookmarks_path):
+            url = bookmark.url.strip()
+            if is_short_link(url):
+                key = url
+            else:
+                parsed = parse_url(url)
+                if parsed is None:
+                    self.skipped += 1
+                    continue
+                key = (parsed.platform, parsed.video_id)
+                url = parsed.canonical_url
+            if key in seen:
+                self.duplicates += 1
+                continue
+            seen.add(key)
+            row_num += 1
+            with self._lock:
+                self._open_rows[row_num] = bookmark._replace(url=url)
+            yield SheetRow(row_num, {'url': url, 'title': bookmark.title})
+
+    async def iter_pages(self, reverse: bool = False) -> AsyncIterator[List[SheetRow]]:
+        """
+        Pages of page_size unique video links, parsed off the event loop.
+        The file is streamed, so reverse only applies within a page (see order_rows).
+        """
+        rows = self._iter_rows()
+        while True:
+            page = await asyncio.to_thread(lambda: [row for _, row in zip(range(self.page_size), rows)])
+            if not page:
+                break
+            yield page
+        logger.info(f"Bookmarks: {self.skipped} non-video links skipped, {self.duplicates} duplicates removed")
+
+    async def iter_rows(self, reverse: bool = False) -> AsyncIterator[SheetRow]:
+        async for page in self.iter_pages(reverse):
+            for row in page:
+                yield row
+
+    def update_row(self, row_index: int, data: Dict[str, Any]):
+        """Buffer a row's result; written out by flush()."""
+        with self._lock:
+            self._pending.setdefault(row_index, {}).update(data)
+            pending = len(self._pending)
+        if pending >= self.page_size:
+            self.flush()
+        else:
+            self.flush_if_due()
+
+    def skip_row(self, row_index: int):
+        """Forget a row the pipeline decided not to write (resumed, another shard's, fresh, no URL)."""
+        with self._lock:
+            self._open_rows.pop(row_index, None)
+
+    def flush_if_due(self):
+        if self._pending and time.monotonic() - self._last_flush >= self.flush_seconds:
+            self.flush()
+
+    def flush(self):
+        """Append every buffered result to the output file as one JSON object per line."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._last_flush = time.monotonic()
+            bookmarks = {row: self._open_rows.pop(row, None) for row in pending}
+        if not pending:
+            return
+
+        written_at = datetime.now().isoformat(timespec='seconds')
+        try:
+            with open(self.output_path, 'a', encoding='utf-8') as f:
+                for row, data in sorted(pending.items()):
+                    bookmark = bookmarks[row]
+                    record = {'row': row, 'written_at': written_at}
+                    if bookmark:
+                        record.update(url=bookmark.url, title=bookmark.title, folder=bookmark.folder)
+                    record.update(data)
+                    f.write(json.dumps(record, ensure_ascii=False) + '\n')
+            logger.info(f"Wrote {len(pending)} results to {self.output_path}")
+            if self.on_flush:
+                self.on_flush(set(pending))
+        except OSError as e:
+            logger.error(f"Failed to write {len(pending)} results to {self.output_path}: {e}; will retry")
+            # Back into the buffer for the next flush; fields written again since then keep the newer value
+            with self._lock:
+                for row, data in pending.items():
+                    self._pending[row] = {**data, **self._pending.get(row, {})}
+                    if bookmarks[row]:
+                        self._open_rows[row] = bookmarks[row]
@@ -0,0 +1,120 @@
+import asyncio
+import gzip
+import json
+import os
+import random
+import time
+from datetime import datetime
+from typing import Optional
+from .logger import setup_logger
+
+logger = setup_logger('diagnostics')
+
+
+class DebugCapture:
+    """
+    Sampled failure snapshots (gzipped HTML, JPEG screenshot, a JSON note with
+    the URL) for working out why a page yielded no metrics.
+
+    Only `sample_rate` of failures are captured. The scrape waits just for the
+    page to hand over its HTML and screenshot; compressing, writing and pruning
+    the directory back under `max_megabytes` happen on a worker thread in the
+    background. At most `max_pending` captures are in flight, further failures
+    are skipped rather than queued.
+    """
+
+    def __init__(self, directory: str, sample_rate: float = 0.1, max_megabytes: float = 50,
+                 screenshot: bool = True, max_pending: int = 4):
+        self.directory = directory
+        self.sample_rate = sample_rate
+        self.max_bytes = int(max_megabytes * 1024 * 1024)
+        self.screenshot = screenshot
+        self.max_pending = max_pending
+        self.captured = 0
+        self.skipped = 0
+        self._pending = set()
+
+    def should_capture(self) -> bool:
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    async def capture(self, page, platform: str, url: str, reason: str):
+        """Snapshot a failed page if this failure is sampled. Never raises."""
+        if not self.should_capture() or len(self._pending) >= self.max_pending:
+            self.skipped += 1
+            return
+        try:
+            # These two must run while we still hold the page; everything else is deferred
+            content = await page.content()
+            screenshot = await page.screenshot(type='jpeg', quality=50) if self.screenshot else None
+        except Exception as e:
+            logger.debug(f"Debug capture of {url} failed: {e}")
+            return
+
+        note = {'platform': platform, 'url': url, 'reason': reason,
+                'captured_at': datetime.now().isoformat(timespec='seconds')}
+        task = asyncio.ensure_future(asyncio.to_thread(self._write, platform, note, content, screenshot))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    def _write(self, platform: str, note: dict, content: str, screenshot: Optional[bytes]):
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            stem = os.path.join(self.directory, f"fail_{platform}_{int(time.time() * 1000)}_{random.randrange(1000):03d}")
+            with gzip.open(stem + '.html.gz', 'wt', encoding='utf-8', compresslevel=6) as f:
+                f.write(content)
+            if screenshot:
+                with open(stem + '.jpg', 'wb') as f:
+                    f.write(screenshot)
+            with open(stem + '.json', 'w', encoding='utf-8') as f:
+                json.dump(note, f)
+            self.captured += 1
+            logger.info(f"Saved debug snapshot for {note['url']} to {stem}.*")
+            self._rotate()
+        except Exception as e:
+            logger.error(f"Failed to save debug snapshot: {e}")
+
+    def _rotate(self):
+        """Delete the oldest snapshots (all files sharing a stem) until the directory fits in max_bytes."""
+        snapshots = {}
+        for entry in os.scandir(self.directory):
+            if entry.is_file():
+                stat = entry.stat()
+                stem = entry.name.split('.', 1)[0]
+                mtime, size, paths = snapshots.get(stem, (stat.st_mtime, 0, []))
+                snapshots[stem] = (min(mtime, stat.st_mtime), size + stat.st_size, paths + [entry.path])
+        total = sum(size for _, size, _ in snapshots.values())
+        for _, size, paths in sorted(snapshots.values()):
+            if total <= self.max_bytes:
+                break
+            for path in paths:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    # Another shard process pruned it first
+                    pass
+            total -= size
+
+    async def drain(self):
+        """Wait for in-flight snapshot writes; called when scrapers close."""
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
+
+
+_capture: Optional[DebugCapture] = None
+
+
+def get_debug_capture(scraping_ops: dict) -> DebugCapture:
+    """Shared DebugCapture from scraping_options.debug_capture, so all platforms share one disk budget."""
+    global _capture
+    if _capture is None:
+        cfg = scraping_ops.get('debug_capture', {})
+        directory = os.path.abspath(os.path.join(os.path.dirname(os.path.dirname(__file__)),
+                                                 cfg.get('dir', '../logs/debug')))
+        _capture = DebugCapture(
+            directory,
+            sample_rate=cfg.get('sample_rate', 0.1) if cfg.get('enabled', True) else 0.0,
+            max_megabytes=cfg.get('max_megabytes', 50),
+            screenshot=cfg.get('screenshot', True),
+            max_pending=cfg.get('max_pending', 4),
+        )
+    return _capture
@@ -0,0 +1,193 @@
+import argparse
+import os
+import sqlite3
+import time
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+from .logger import setup_logger
+
+logger = setup_logger('history')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS samples (
+    platform TEXT    NOT NULL,
+    video_id TEXT    NOT NULL,
+    ts       INTEGER NOT NULL,
+    views    INTEGER NOT NULL,
+    likes    INTEGER NOT NULL,
+    PRIMARY KEY (platform, video_id, ts)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS samples_ts ON samples (ts);
+"""
+
+# Each video's reference sample: the newest one at least `window` seconds older than
+# its `now` (the video's latest sample, or the given time), else its oldest one.
+# Every video is resolved in the same set-based pass instead of one query per video.
+REFERENCE_SQL = """
+WITH latest AS (
+    SELECT platform, video_id, MAX(ts) AS ts
+    FROM samples {scope}
+    GROUP BY platform, video_id
+),
+reference AS (
+    SELECT s.platform, s.video_id, l.ts AS latest_ts,
+           COALESCE(MAX(CASE WHEN s.ts <= COALESCE(:now, l.ts) - :window THEN s.ts END), MIN(s.ts)) AS ts
+    FROM samples s JOIN latest l ON s.platform = l.platform AND s.video_id = l.video_id
+    GROUP BY s.platform, s.video_id
+)
+"""
+SCOPE_WANTED = "WHERE (platform, video_id) IN (SELECT platform, video_id FROM temp.wanted)"
+
+GROWTH_SQL = REFERENCE_SQL + """
+SELECT r.platform, r.video_id, cur.ts, cur.views, cur.likes, old.ts, old.views, old.likes
+FROM reference r
+JOIN samples cur ON cur.platform = r.platform AND cur.video_id = r.video_id AND cur.ts = r.latest_ts
+JOIN samples old ON old.platform = r.platform AND old.video_id = r.video_id AND old.ts = r.ts
+"""
+
+Key = Tuple[str, str]
+
+
+class Sample(NamedTuple):
+    ts: int
+    views: int
+    likes: int
+
+
+class Growth(NamedTuple):
+    """A video's change between two samples; rates are per hour, None over a zero-length span."""
+    views: int
+    likes: int
+    hours: float
+    views_per_hour: Optional[float]
+    likes_per_hour: Optional[float]
+    # Views gained over the span as a percentage of the earlier count
+    growth_pct: Optional[float]
+
+
+def growth_between(old: Sample, new: Sample) -> Growth:
+    hours = (new.ts - old.ts) / 3600
+    if hours <= 0:
+        return Growth(new.views, new.likes, 0.0, None, None, None)
+    return Growth(
+        new.views, new.likes, round(hours, 2),
+        round((new.views - old.views) / hours, 2),
+        round((new.likes - old.likes) / hours, 2),
+        round(100 * (new.views - old.views) / old.views, 2) if old.views else None,
+    )
+
+
+class MetricsHistory:
+    """
+    Append-only history of every scraped (views, likes) sample, one row per
+    video per scrape, so growth survives the sheet overwriting its counts.
+
+    Samples are buffered and inserted in batches. The growth queries take a
+    whole set of videos at once and resolve them in one SQL pass.
+    """
+
+    def __init__(self, path: str, retention_days: float = 0, batch_size: int = 500):
+        self.path = path
+        self.batch_size = batch_size
+        self._buffer: List[tuple] = []
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Every shard appends its batches here and the growth CLI may read mid-run; a locked
+        # database should delay a flush rather than drop its samples
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.executescript(SCHEMA)
+        self.conn.execute("CREATE TEMP TABLE IF NOT EXISTS wanted "
+                          "(platform TEXT, video_id TEXT, PRIMARY KEY (platform, video_id)) WITHOUT ROWID")
+        if retention_days:
+            pruned = self.conn.execute("DELETE FROM samples WHERE ts < ?",
+                                       (int(time.time() - retention_days * 86400),)).rowcount
+            self.conn.commit()
+            if pruned:
+                logger.info(f"Pruned {pruned} history samples older than {retention_days} days")
+
+    def record(self, platform: str, video_id: str, views: int, likes: int, ts: Optional[float] = None):
+        self._buffer.append((platform, video_id, int(ts if ts is not None else time.time()), views, likes))
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self._buffer:
+            return
+        rows, self._buffer = self._buffer, []
+        # A second scrape within the same second replaces the first
+        self.conn.executemany("INSERT OR REPLACE INTO samples VALUES (?, ?, ?, ?, ?)", rows)
+        self.conn.commit()
+
+    def _scope(self, keys: Optional[Iterable[Key]]) -> str:
+        if keys is None:
+            return ""
+        self.conn.execute("DELETE FROM temp.wanted")
+        self.conn.executemany("INSERT OR IGNORE INTO temp.wanted VALUES (?, ?)", keys)
+        return SCOPE_WANTED
+
+    def reference_samples(self, keys: Iterable[Key], window_hours: float = 24,
+                          now: Optional[float] = None) -> Dict[Key, Sample]:
+        """
+        For a sample about to be taken at `now`, the stored sample each video's
+        rate should be measured against: the newest one at least window_hours
+        old, else the oldest. Videos without history are left out.
+        """
+        self.flush()
+        scope = self._scope(keys)
+        sql = REFERENCE_SQL.format(scope=scope) + """
+            SELECT r.platform, r.video_id, s.ts, s.views, s.likes FROM reference r
+            JOIN samples s ON s.platform = r.platform AND s.video_id = r.video_id AND s.ts = r.ts
+        """
+        params = {'now': int(now if now is not None else time.time()), 'window': int(window_hours * 3600)}
+        return {(platform, video_id): Sample(ts, views, likes)
+                for platform, video_id, ts, views, likes in self.conn.execute(sql, params)}
+
+    def growth(self, keys: Optional[Iterable[Key]] = None, window_hours: float = 24) -> Dict[Key, Growth]:
+        """
+        Growth over each video's trailing window_hours, ending at its latest
+        sample (since its first sample when the history is shorter). All
+        videos when keys is None.
+        """
+        self.flush()
+        sql = GROWTH_SQL.format(scope=self._scope(keys))
+        params = {'now': None, 'window': int(window_hours * 3600)}
+        return {(platform, video_id): growth_between(Sample(old_ts, old_views, old_likes), Sample(ts, views, likes))
+                for platform, video_id, ts, views, likes, old_ts, old_views, old_likes
+                in self.conn.execute(sql, params)}
+
+    def close(self):
+        self.flush()
+        self.conn.close()
+
+
+def open_history(config: dict) -> Optional[MetricsHistory]:
+    """MetricsHistory from scraping_options.history, or None when disabled."""
+    cfg = config['scraping_options'].get('history', {})
+    if not cfg.get('enabled', False):
+        return None
+    path = os.path.abspath(os.path.join(os.path.dirname(os.path.dirname(__file__)),
+                                        cfg.get('path', '../data/metrics_history.sqlite3')))
+    return MetricsHistory(path, cfg.get('retention_days', 0), cfg.get('batch_size', 500))
+
+
+def main(argv=None):
+    """Print the fastest-growing videos in the history."""
+    parser = argparse.ArgumentParser(description="Fastest-growing videos in the metrics history.")
+    parser.add_argument('--path', default=os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))),
+                                                       'data', 'metrics_history.sqlite3'))
+    parser.add_argument('--window', type=float, default=24, help="trailing window in hours")
+    parser.add_argument('--top', type=int, default=20)
+    args = parser.parse_args(argv)
+
+    history = MetricsHistory(args.path)
+    growth = history.growth(window_hours=args.window)
+    history.close()
+    ranked = sorted(((g.views_per_hour, key, g) for key, g in growth.items() if g.views_per_hour is not None),
+                    reverse=True)[:args.top]
+    print(f"{'platform':<10} {'video_id':<24} {'views':>12} {'views/h':>10} {'likes/h':>9} {'growth':>8} {'hours':>7}")
+    for _, (platform, video_id), g in ranked:
+        pct = f"{g.growth_pct:.1f}%" if g.growth_pct is not None else '-'
+        print(f"{platform:<10} {video_id:<24} {g.views:>12,} {g.views_per_hour:>10,.1f} "
+              f"{g.likes_per_hour:>9,.1f} {pct:>8} {g.hours:>7.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+import json
+import os
+from typing import TYPE_CHECKING, Optional
+from .logger import setup_logger
+
+if TYPE_CHECKING:
+    import httpx
+
+logger = setup_logger('http_client')
+
+# Same UA as the Playwright context so both tiers look like one browser
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+
+_client: Optional['httpx.AsyncClient'] = None
+# Cookie files already merged into the shared client's jar
+_cookie_paths = set()
+
+
+def load_cookies(path: str) -> 'httpx.Cookies':
+    """Load cookies exported from the browser context (Playwright's cookie format)."""
+    import httpx
+
+    cookies = httpx.Cookies()
+    if not os.path.exists(path):
+        return cookies
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            for c in json.load(f):
+                cookies.set(c['name'], c['value'], domain=c.get('domain', ''), path=c.get('path', '/'))
+    except Exception as e:
+        logger.warning(f"Could not load cookies from {path}: {e}")
+    return cookies
+
+
+def get_http_client(scraping_ops: dict, cookies_path: Optional[str] = None) -> 'httpx.AsyncClient':
+    """
+    Shared pooled async client; created on first use. Each cookies_path is
+    loaded into its jar the first time a caller passes it, whether or not
+    that caller created the client.
+    """
+    global _client
+    if _client is None:
+        # Imported with the first client, so runs that never fetch over HTTP don't load httpx
+        import httpx
+
+        cfg = scraping_ops.get('http', {})
+        _client = httpx.AsyncClient(
+            headers={'User-Agent': USER_AGENT, 'Accept-Language': 'en-US,en;q=0.9'},
+            timeout=cfg.get('timeout', 15),
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=cfg.get('max_connections', 20),
+                                max_keepalive_connections=cfg.get('max_keepalive', 10)),
+        )
+    if cookies_path and cookies_path not in _cookie_paths:
+        # Cookies are domain-scoped, so one jar can hold every platform's session
+        _client.cookies.update(load_cookies(cookies_path))
+        _cookie_paths.add(cookies_path)
+    return _client
+
+
+async def close_http_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+        _cookie_paths.clear()
@@ -0,0 +1,85 @@
+import json
+import os
+import threading
+from typing import Dict, Iterable
+from .logger import setup_logger
+
+logger = setup_logger('journal')
+
+# Outcomes a resumed run keeps; ERROR and CRITICAL_ERROR rows are scraped again
+DONE_STATUSES = ('SUCCESS', 'UNSUPPORTED_PLATFORM')
+
+
+class RunJournal:
+    """
+    Append-only JSONL write-ahead log for a run.
+    Every row outcome is journaled before it is handed to the sheet buffer,
+    and every successful sheet flush is journaled afterwards. After a crash,
+    a resumed run skips rows with a final outcome (see DONE_STATUSES), retries
+    failed ones, and replays the outcomes that were never flushed.
+
+    Record types:
+        {"type": "outcome", "row": 12, "url": "...", "data": {...}}
+        {"type": "flushed", "rows": [12, 13]}
+    """
+
+    def __init__(self, path: str, resume: bool = False):
+        self.path = path
+        self.outcomes: Dict[int, dict] = {}
+        self.flushed = set()
+        self._lock = threading.Lock()
+
+        if resume and os.path.exists(path):
+            self._load()
+            logger.info(f"Resuming from journal: {len(self.outcomes)} rows done, "
+                        f"{len(self.unflushed())} not yet in the sheet")
+        elif os.path.exists(path):
+            # New run: the previous journal no longer describes the sheet
+            os.replace(path, path + '.prev')
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def _load(self):
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Torn last line from a crash mid-write
+                    continue
+                if record.get('type') == 'outcome':
+                    self.outcomes[record['row']] = record
+                    self.flushed.discard(record['row'])
+                elif record.get('type') == 'flushed':
+                    self.flushed.update(record['rows'])
+
+    def _append(self, record: dict):
+        with self._lock:
+            self._file.write(json.dumps(record) + '\n')
+            self._file.flush()
+
+    def is_done(self, row_num: int, url: str) -> bool:
+        """True if this row already has a final outcome for the same URL."""
+        record = self.outcomes.get(row_num)
+        return (record is not None and record.get('url') == url
+                and record['data'].get('status') in DONE_STATUSES)
+
+    def record(self, row_num: int, url: str, data: dict):
+        record = {'type': 'outcome', 'row': row_num, 'url': url, 'data': data}
+        self.outcomes[row_num] = record
+        self._append(record)
+
+    def mark_flushed(self, rows: Iterable[int]):
+        rows = sorted(set(rows))
+        self.flushed.update(rows)
+        self._append({'type': 'flushed', 'rows': rows})
+        with self._lock:
+            os.fsync(self._file.fileno())
+
+    def unflushed(self) -> Dict[int, dict]:
+        """Row outcomes that never reached the sheet: {row_num: data}."""
+        return {row: record['data'] for row, record in self.outcomes.items() if row not in self.flushed}
+
+    def close(self):
+        self._file.close()
@@ -1,30 +1,119 @@
+import atexit
+import json
 import logging
+import logging.handlers
 import os
+import queue
 import sys
 
+LOG_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'logs')
+
+# Names of every logger handed out by setup_logger, so configure_logging can rewire them all
+_loggers = []
+# Handlers shared by all of those loggers: a single QueueHandler in queue mode, else the sinks
+_handlers = []
+_level = logging.INFO
+_listener = None
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, for log shippers."""
+
+    def format(self, record):
+        entry = {
+            'ts': self.formatTime(record, '%Y-%m-%dT%H:%M:%S'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def _build_sinks(options: dict):
+    """The handlers that actually write: a size-rotated log file and the console."""
+    log_file = options.get('file')
+    if log_file:
+        log_file = os.path.abspath(os.path.join(os.path.dirname(os.path.dirname(__file__)), log_file))
+    else:
+        log_file = os.path.join(LOG_DIR, 'scraper.log')
+    os.makedirs(os.path.dirname(log_file), exist_ok=True)
+
+    # File Handler, rotated by size so long runs at DEBUG can't fill the disk
+    max_bytes = int(options.get('max_megabytes', 10) * 1024 * 1024)
+    file_handler = logging.handlers.RotatingFileHandler(
+        log_file, maxBytes=max_bytes, backupCount=options.get('backup_count', 5), encoding='utf-8')
+    if options.get('json', False):
+        file_handler.setFormatter(JsonFormatter())
+    else:
+        file_handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+
+    # Stream Handler (Console)
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(logging.Formatter('[%(levelname)s] %(message)s'))
+
+    return [file_handler, stream_handler]
+
+
+def stop_logging():
+    """Drain queued records to their sinks and close them. Safe to call more than once."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+    for handler in _handlers:
+        handler.close()
+
+
+def configure_logging(options: dict = None):
+    """
+    (Re)build the shared handlers from the settings.json 'logging' section and
+    attach them to every module logger.
+
+    With `queue` (the default), loggers only put records on an in-memory queue
+    and a QueueListener thread does the file and console writes, so a log call
+    inside the event loop never waits on I/O.
+    """
+    global _handlers, _level, _listener
+    options = options or {}
+    stop_logging()
+
+    _level = logging.getLevelName(str(options.get('level', 'INFO')).upper())
+    sinks = _build_sinks(options)
+    if options.get('queue', True):
+        log_queue = queue.SimpleQueue()
+        _listener = logging.handlers.QueueListener(log_queue, *sinks, respect_handler_level=True)
+        _listener.start()
+        _handlers = [logging.handlers.QueueHandler(log_queue)]
+    else:
+        _handlers = sinks
+
+    for name in _loggers:
+        _attach(logging.getLogger(name))
+
+
+def _attach(logger):
+    logger.setLevel(_level)
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+    for handler in _handlers:
+        logger.addHandler(handler)
+
+
 def setup_logger(name='social_scraper'):
     """Configure and return a logger instance."""
     logger = logging.getLogger(name)
-    logger.setLevel(logging.INFO)
-    
-    if logger.hasHandlers():
+    if name in _loggers:
         return logger
-        
-    # Create logs directory if it doesn't exist
-    log_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'logs')
-    os.makedirs(log_dir, exist_ok=True)
-    
-    # File Handler
-    file_handler = logging.FileHandler(os.path.join(log_dir, 'scraper.log'), encoding='utf-8')
-    file_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-    file_handler.setFormatter(file_formatter)
-    
-    # Stream Handler (Console)
-    stream_handler = logging.StreamHandler(sys.stdout)
-    stream_formatter = logging.Formatter('[%(levelname)s] %(message)s')
-    stream_handler.setFormatter(stream_formatter)
-    
-    logger.addHandler(file_handler)
-    logger.addHandler(stream_handler)
-    
+
+    if not _handlers:
+        # Defaults until main.py applies the 'logging' section of settings.json
+        configure_logging()
+    _loggers.append(name)
+    _attach(logger)
     return logger
+
+
+# Flush whatever is still queued when the process exits
+atexit.register(stop_logging)
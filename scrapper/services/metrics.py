@@ -0,0 +1,209 @@
+import json
+import os
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+from .logger import setup_logger
+
+logger = setup_logger('metrics')
+
+# Histogram bucket upper bounds in seconds, from a blocked-request page load to a stuck navigation
+BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, float('inf'))
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram, same shape as a Prometheus histogram."""
+
+    def __init__(self):
+        self.buckets = [0] * len(BUCKETS)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float):
+        self.count += 1
+        self.sum += seconds
+        self.max = max(self.max, seconds)
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                self.buckets[i] += 1
+                break
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th quantile (max for the last bucket)."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(BUCKETS, self.buckets):
+            seen += n
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def to_dict(self) -> dict:
+        return {
+            'count': self.count,
+            'sum': round(self.sum, 3),
+            'mean': round(self.sum / self.count, 3) if self.count else 0.0,
+            'p50': self.quantile(0.5),
+            'p95': self.quantile(0.95),
+            'max': round(self.max, 3),
+        }
+
+
+class RunMetrics:
+    """
+    Per-run telemetry shared by the whole process: stage latencies per platform
+    (navigate, selectors, yt-dlp, sheet writes, ...) and labelled counters
+    (scrape outcomes by error class, extraction strategy hits).
+    Thread-safe, since yt-dlp and Sheets calls report from worker threads.
+    """
+
+    def __init__(self):
+        self.started_at = datetime.now()
+        self.stages: Dict[Tuple[str, str], Histogram] = {}
+        self.counters = Counter()
+        self._lock = threading.Lock()
+
+    def observe(self, stage: str, platform: str, seconds: float):
+        with self._lock:
+            key = (stage, platform)
+            if key not in self.stages:
+                self.stages[key] = Histogram()
+            self.stages[key].observe(seconds)
+
+    @contextmanager
+    def time(self, stage: str, platform: str):
+        """Time a block: `with metrics.time('navigate', 'instagram'):`"""
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.observe(stage, platform, time.monotonic() - started)
+
+    def stage(self, stage: str, platform: str) -> Optional[dict]:
+        """Latency summary of one stage so far, or None if it was never timed."""
+        with self._lock:
+            histogram = self.stages.get((stage, platform))
+            return histogram.to_dict() if histogram else None
+
+    def count(self, name: str, **labels):
+        """Increment a counter, e.g. count('strategy', platform='instagram', strategy='json_ld')."""
+        with self._lock:
+            self.counters[(name, tuple(sorted(labels.items())))] += 1
+
+    def report(self, extra: dict = None) -> dict:
+        """JSON run report: stage latency summaries, counters, and strategy hit rates."""
+        with self._lock:
+            stages = {}
+            for (stage, platform), histogram in sorted(self.stages.items()):
+                stages.setdefault(platform, {})[stage] = histogram.to_dict()
+
+            counters = {}
+            for (name, labels), value in sorted(self.counters.items()):
+                counters.setdefault(name, []).append({**dict(labels), 'value': value})
+
+        # Share of scrapes each strategy answered, per platform; decaying selectors show up here first
+        strategies = {}
+        for entry in counters.get('strategy', []):
+            strategies.setdefault(entry['platform'], {})[entry['strategy']] = entry['value']
+        hit_rates = {
+            platform: {name: round(n / sum(hits.values()), 3) for name, n in hits.items()}
+            for platform, hits in strategies.items()
+        }
+
+        return {
+            'started_at': self.started_at.isoformat(timespec='seconds'),
+            'finished_at': datetime.now().isoformat(timespec='seconds'),
+            'stages': stages,
+            'counters': counters,
+            'strategy_hit_rates': hit_rates,
+            **(extra or {}),
+        }
+
+    def prometheus_text(self) -> str:
+        """Prometheus text exposition format, for node_exporter's textfile collector."""
+        lines = ['# HELP scraper_stage_seconds Time spent in each scrape stage.',
+                 '# TYPE scraper_stage_seconds histogram']
+        with self._lock:
+            for (stage, platform), histogram in sorted(self.stages.items()):
+                labels = f'stage="{stage}",platform="{platform}"'
+                cumulative = 0
+                for bound, n in zip(BUCKETS, histogram.buckets):
+                    cumulative += n
+                    le = '+Inf' if bound == float('inf') else repr(float(bound))
+                    lines.append(f'scraper_stage_seconds_bucket{{{labels},le="{le}"}} {cumulative}')
+                lines.append(f'scraper_stage_seconds_sum{{{labels}}} {histogram.sum:.6f}')
+                lines.append(f'scraper_stage_seconds_count{{{labels}}} {histogram.count}')
+
+            names = sorted({name for name, _ in self.counters})
+            for name in names:
+                lines.append(f'# TYPE scraper_{name}_total counter')
+                for (counter, labels), value in sorted(self.counters.items()):
+                    if counter == name:
+                        label_text = ','.join(f'{k}="{v}"' for k, v in labels)
+                        lines.append(f'scraper_{name}_total{{{label_text}}} {value}')
+        return '\n'.join(lines) + '\n'
+
+
+def error_class(error) -> str:
+    """
+    Short class name for a failed scrape: the exception type, or the error code
+    a scraper returned (e.g. INSTAGRAM_PLAYBACK_ERROR). Free-text messages
+    collapse to ScrapeError so counters keep a small label set.
+    """
+    if isinstance(error, BaseException):
+        return type(error).__name__
+    text = str(error or '')
+    if text and text.replace('_', '').isalnum() and text.upper() == text:
+        return text
+    if 'Timeout' in text:
+        return 'TimeoutError'
+    return 'ScrapeError'
+
+
+def _atomic_write(path: str, text: str):
+    # Scrapers of the textfile must never see a half-written file
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+def export_metrics(metrics: RunMetrics, metrics_cfg: dict, base_dir: str, extra: dict = None, path_hook=None):
+    """
+    Write the run report and/or Prometheus textfile configured in
+    scraping_options.metrics. Paths are relative to base_dir; path_hook lets
+    shard workers rewrite them so they don't overwrite each other.
+    """
+    if not metrics_cfg.get('enabled', True):
+        return
+    targets = (
+        ('report_path', lambda: json.dumps(metrics.report(extra), indent=2)),
+        ('prometheus_path', metrics.prometheus_text),
+    )
+    for key, render in targets:
+        path = metrics_cfg.get(key)
+        if not path:
+            continue
+        path = os.path.abspath(os.path.join(base_dir, path))
+        if path_hook:
+            path = path_hook(path)
+        try:
+            _atomic_write(path, render())
+            logger.info(f"Wrote run metrics to {path}")
+        except OSError as e:
+            logger.error(f"Failed to write run metrics to {path}: {e}")
+
+
+_metrics = RunMetrics()
+
+
+def get_metrics() -> RunMetrics:
+    """Process-wide metrics for the current run."""
+    return _metrics
@@ -0,0 +1,85 @@
+import asyncio
+from collections import Counter
+from typing import Dict
+from .logger import setup_logger
+
+logger = setup_logger('rate_limiter')
+
+
+class AdaptiveRateLimiter:
+    """
+    AIMD pacing for one platform, shared by all of that platform's workers.
+    Each acquire() reserves the next free slot, spaced 1/rate seconds apart.
+    Healthy responses nudge the rate up additively; throttling signals
+    (login walls, playback errors, captchas, timeouts) cut it multiplicatively.
+    """
+
+    def __init__(self, name: str, rate: float, min_rate: float, max_rate: float,
+                 increase: float = 0.02, decrease: float = 0.5):
+        self.name = name
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.signals = Counter()
+        self._next_slot = 0.0
+
+    @property
+    def current_rate(self) -> float:
+        """Requests per second currently allowed."""
+        return self.rate
+
+    async def acquire(self):
+        """Wait for this caller's slot. Slots are reserved up front, so waiters never bunch up."""
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        slot = max(now, self._next_slot)
+        self._next_slot = slot + 1.0 / self.rate
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+    def record_success(self):
+        self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def record_throttle(self, reason: str):
+        self.signals[reason] += 1
+        self.rate = max(self.min_rate, self.rate * self.decrease)
+        # Push out the next slot too, so requests already queued also slow down
+        now = asyncio.get_running_loop().time()
+        self._next_slot = max(self._next_slot, now + 1.0 / self.rate)
+        logger.warning(f"[{self.name}] Throttle signal '{reason}'; rate now {self.rate:.3f} req/s")
+
+    def snapshot(self) -> dict:
+        return {
+            'platform': self.name,
+            'rate': round(self.rate, 4),
+            'signals': dict(self.signals),
+        }
+
+
+_limiters: Dict[str, AdaptiveRateLimiter] = {}
+
+
+def get_rate_limiter(platform: str, scraping_ops: dict) -> AdaptiveRateLimiter:
+    """
+    Shared limiter for a platform, built from scraping_options.rate_limit.
+    Unset values fall back to 'default', and the starting rate to 1/throttle_seconds.
+    """
+    if platform not in _limiters:
+        cfg = scraping_ops.get('rate_limit', {})
+        opts = {**cfg.get('default', {}), **cfg.get(platform, {})}
+        initial = opts.get('initial_rate', 1.0 / max(scraping_ops.get('throttle_seconds', 3), 0.001))
+        _limiters[platform] = AdaptiveRateLimiter(
+            platform,
+            rate=initial,
+            min_rate=opts.get('min_rate', initial / 10),
+            max_rate=opts.get('max_rate', initial * 4),
+            increase=opts.get('increase', 0.02),
+            decrease=opts.get('decrease', 0.5),
+        )
+    return _limiters[platform]
+
+
+def all_rate_limiters() -> Dict[str, AdaptiveRateLimiter]:
+    return dict(_limiters)
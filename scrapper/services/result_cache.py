@@ -0,0 +1,80 @@
+import json
+import os
+import sqlite3
+import time
+from typing import Optional
+from .logger import setup_logger
+
+logger = setup_logger('result_cache')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    platform   TEXT NOT NULL,
+    video_id   TEXT NOT NULL,
+    result     TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    PRIMARY KEY (platform, video_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS results_fetched_at ON results (fetched_at);
+"""
+
+
+class ResultCache:
+    """
+    On-disk cache of successful scrape results keyed by (platform, video_id).
+    Entries expire after their platform's TTL; expired entries and anything
+    beyond max_entries (oldest first) are evicted when the cache is opened.
+    """
+
+    def __init__(self, path: str, ttl_minutes: dict, max_entries: int = 200000):
+        self.path = path
+        self.ttl_minutes = ttl_minutes
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Shard processes share the file, so wait on their write locks instead of failing
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.executescript(SCHEMA)
+        self.evict()
+
+    def _ttl_seconds(self, platform: str) -> float:
+        return 60 * self.ttl_minutes.get(platform, self.ttl_minutes.get('default', 60))
+
+    def get(self, platform: str, video_id: str) -> Optional[dict]:
+        """Cached result if still fresh, with its 'fetched_at' epoch time."""
+        row = self.conn.execute(
+            "SELECT result, fetched_at FROM results WHERE platform = ? AND video_id = ?",
+            (platform, video_id)).fetchone()
+        if row is None or time.time() - row[1] > self._ttl_seconds(platform):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return {**json.loads(row[0]), 'fetched_at': row[1]}
+
+    def put(self, platform: str, video_id: str, result: dict):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO results (platform, video_id, result, fetched_at) VALUES (?, ?, ?, ?)",
+            (platform, video_id, json.dumps(result), time.time()))
+        self.conn.commit()
+
+    def evict(self):
+        """Drop entries past the longest TTL, then trim to max_entries."""
+        longest = max([self._ttl_seconds('default')] + [60 * m for m in self.ttl_minutes.values()])
+        expired = self.conn.execute("DELETE FROM results WHERE fetched_at < ?",
+                                    (time.time() - longest,)).rowcount
+        trimmed = 0
+        count = self.conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+        if count > self.max_entries:
+            trimmed = self.conn.execute(
+                "DELETE FROM results WHERE (platform, video_id) IN "
+                "(SELECT platform, video_id FROM results ORDER BY fetched_at LIMIT ?)",
+                (count - self.max_entries,)).rowcount
+        self.conn.commit()
+        if expired or trimmed:
+            logger.info(f"Evicted {expired} expired and {trimmed} excess cache entries")
+
+    def close(self):
+        if self.hits or self.misses:
+            logger.info(f"Result cache: {self.hits} hits, {self.misses} misses")
+        self.conn.close()
@@ -0,0 +1,163 @@
+import asyncio
+import random
+from collections import Counter
+from typing import Awaitable, Callable, Dict, NamedTuple, Optional
+from .logger import setup_logger
+
+logger = setup_logger('retry')
+
+# Failures that are the video's fault, not the run's; retrying can't change the answer
+PERMANENT_MARKERS = (
+    'video unavailable', 'private video', 'has been removed', 'has been terminated',
+    'confirm your age', 'not available in your country', 'members-only', 'does not exist',
+)
+NETWORK_ERROR_CLASSES = (
+    'ConnectError', 'ConnectTimeout', 'ReadError', 'WriteError', 'NetworkError',
+    'RemoteProtocolError', 'ConnectionError', 'ConnectionResetError', 'ConnectionRefusedError',
+)
+NETWORK_MARKERS = (
+    'net::err_', 'connection reset', 'connection refused', 'connection aborted',
+    'name resolution', 'name or service not known', 'temporarily unavailable',
+    'http error 429', 'http error 5', 'urlopen error',
+)
+EXTRACTOR_ERROR_CLASSES = ('DownloadError', 'ExtractorError')
+
+# Defaults per failure class: retries per URL, first backoff delay, and retries allowed per run
+DEFAULT_CLASSES = {
+    'timeout': {'base_delay_seconds': 15},
+    'network_error': {'base_delay_seconds': 5},
+    # A login wall or captcha usually means the session is burned; wait it out, and not for every row
+    'login_wall': {'max_retries': 1, 'base_delay_seconds': 300, 'budget': 20},
+    'playback_error': {'base_delay_seconds': 120, 'budget': 50},
+    'extractor_error': {'max_retries': 1, 'base_delay_seconds': 60},
+}
+
+
+def classify_failure(error, error_class: Optional[str] = None) -> Optional[str]:
+    """
+    Retry class of a failed scrape (a result's 'error' and 'error_class', or an
+    exception): 'timeout', 'login_wall', 'playback_error', 'network_error' or
+    'extractor_error'. None means retrying won't help.
+    """
+    if isinstance(error, BaseException):
+        error_class = error_class or type(error).__name__
+    text = str(error or '')
+    lowered = text.lower()
+    error_class = error_class or ''
+
+    if 'LOGIN_WALL' in text or 'CAPTCHA' in text:
+        return 'login_wall'
+    if 'PLAYBACK_ERROR' in text:
+        return 'playback_error'
+    if any(marker in lowered for marker in PERMANENT_MARKERS):
+        return None
+    if 'Timeout' in error_class or 'timeout' in lowered or 'timed out' in lowered:
+        return 'timeout'
+    if error_class in NETWORK_ERROR_CLASSES or any(marker in lowered for marker in NETWORK_MARKERS):
+        return 'network_error'
+    if error_class in EXTRACTOR_ERROR_CLASSES or 'unable to extract' in lowered:
+        return 'extractor_error'
+    return None
+
+
+class RetryClass(NamedTuple):
+    max_retries: int
+    base_delay: float
+    # Retries of this class allowed across the whole run; None for no cap
+    budget: Optional[int]
+
+
+class RetryPolicy:
+    """Per-class retry limits and jittered exponential backoff."""
+
+    def __init__(self, classes: Dict[str, RetryClass], max_delay: float = 600, jitter: float = 0.5):
+        self.classes = classes
+        self.max_delay = max_delay
+        self.jitter = jitter
+
+    def allows(self, failure_class: str, attempt: int) -> bool:
+        """Whether a URL that has failed `attempt` times may be tried again."""
+        rule = self.classes.get(failure_class)
+        return rule is not None and attempt <= rule.max_retries
+
+    def delay_for(self, failure_class: str, attempt: int) -> float:
+        """Seconds to wait before retry number `attempt`: doubling from base_delay, capped, then jittered."""
+        delay = min(self.max_delay, self.classes[failure_class].base_delay * 2 ** (attempt - 1))
+        return delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+
+def load_retry_policy(scraping_ops: dict) -> Optional[RetryPolicy]:
+    """
+    RetryPolicy from scraping_options.retry, or None when disabled. Per-class
+    values fall back to the section's own, and max_retries to scraping_options.max_retries.
+    """
+    cfg = scraping_ops.get('retry', {})
+    if not cfg.get('enabled', True):
+        return None
+    classes = {}
+    for name, defaults in DEFAULT_CLASSES.items():
+        opts = {**defaults, **cfg.get('classes', {}).get(name, {})}
+        classes[name] = RetryClass(
+            max_retries=int(opts.get('max_retries', cfg.get('max_retries', scraping_ops.get('max_retries', 2)))),
+            base_delay=float(opts.get('base_delay_seconds', cfg.get('base_delay_seconds', 30))),
+            budget=opts.get('budget', cfg.get('budget')),
+        )
+    return RetryPolicy(classes, cfg.get('max_delay_seconds', 600), cfg.get('jitter', 0.5))
+
+
+class RetryQueue:
+    """
+    Holds failed scrapes until their backoff delay has passed, then hands them
+    back to the scheduler. Waiting happens in timer tasks outside the worker
+    pools, so a row waiting to be retried never occupies a worker.
+    """
+
+    def __init__(self, policy: RetryPolicy):
+        self.policy = policy
+        self.scheduled = Counter()
+        self.exhausted = Counter()
+        self._pending = set()
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def schedule(self, failure_class: str, attempt: int, resubmit: Callable[[], Awaitable[None]]) -> Optional[float]:
+        """
+        Queue retry number `attempt` if the class's per-URL limit and run budget
+        allow it. Returns the delay in seconds, or None when the failure is final.
+        """
+        if not self.policy.allows(failure_class, attempt):
+            return None
+        budget = self.policy.classes[failure_class].budget
+        if budget is not None and self.scheduled[failure_class] >= budget:
+            if not self.exhausted[failure_class]:
+                logger.warning(f"Retry budget for {failure_class} used up ({budget}); further failures are final")
+            self.exhausted[failure_class] += 1
+            return None
+
+        self.scheduled[failure_class] += 1
+        delay = self.policy.delay_for(failure_class, attempt)
+        task = asyncio.ensure_future(self._fire(delay, resubmit))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+        return delay
+
+    async def _fire(self, delay: float, resubmit: Callable[[], Awaitable[None]]):
+        await asyncio.sleep(delay)
+        try:
+            await resubmit()
+        except Exception as e:
+            logger.error(f"Failed to re-queue a retry: {e}")
+
+    async def wait(self):
+        """Wait until every retry queued so far is back on the scheduler."""
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
+
+    def cancel(self):
+        for task in self._pending:
+            task.cancel()
+
+    def snapshot(self) -> dict:
+        return {'scheduled': dict(self.scheduled), 'budget_exhausted': dict(self.exhausted)}
@@ -0,0 +1,99 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Optional
+from .logger import setup_logger
+
+logger = setup_logger('scheduler')
+
+Job = Callable[[], Awaitable[None]]
+
+
+class PlatformWorkerPool:
+    """Fixed number of asyncio workers draining one platform's job queue."""
+
+    def __init__(self, platform: str, size: int, on_take: Optional[Callable[[], None]] = None):
+        self.platform = platform
+        self.size = max(1, int(size))
+        # Unbounded: a full queue here must never stop rows for other platforms
+        # from being queued; RowScheduler applies backpressure across all pools
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.on_take = on_take
+        self.workers = [
+            asyncio.create_task(self._worker(), name=f"{platform}-worker-{i}")
+            for i in range(self.size)
+        ]
+
+    async def _worker(self):
+        while True:
+            job = await self.queue.get()
+            if self.on_take:
+                self.on_take()
+            try:
+                await job()
+            except Exception as e:
+                # Jobs handle their own errors; this only guards the worker itself
+                logger.error(f"[{self.platform}] Worker job crashed: {e}")
+            finally:
+                self.queue.task_done()
+
+    async def drain(self):
+        """Wait until the queue is empty and every job taken from it has finished."""
+        await self.queue.join()
+
+    async def join(self):
+        await self.drain()
+        for worker in self.workers:
+            worker.cancel()
+        await asyncio.gather(*self.workers, return_exceptions=True)
+
+
+class RowScheduler:
+    """
+    Fans row jobs out to per-platform worker pools.
+    A slow platform only occupies its own workers, so rows for other
+    platforms keep flowing. submit() never blocks; callers that produce
+    rows wait in wait_for_room() until the jobs queued across every
+    platform drop below max_queued.
+    """
+
+    def __init__(self, limits: Optional[Dict[str, int]] = None, default_limit: int = 1, max_queued: int = 2000):
+        self.limits = limits or {}
+        self.default_limit = default_limit
+        self.max_queued = max(1, int(max_queued))
+        self.pools: Dict[str, PlatformWorkerPool] = {}
+        self._room = asyncio.Event()
+
+    @property
+    def queued(self) -> int:
+        """Jobs waiting for a worker, across every platform."""
+        return sum(pool.queue.qsize() for pool in self.pools.values())
+
+    def limit_for(self, platform: str) -> int:
+        return int(self.limits.get(platform, self.default_limit))
+
+    def _job_taken(self):
+        if self.queued < self.max_queued:
+            self._room.set()
+
+    async def wait_for_room(self):
+        """Wait until fewer than max_queued jobs are waiting, across all platforms."""
+        while self.queued >= self.max_queued:
+            self._room.clear()
+            await self._room.wait()
+
+    async def submit(self, platform: str, job: Job, limit: Optional[int] = None):
+        """Queue a job for a platform; never waits on other platforms' backlogs."""
+        pool = self.pools.get(platform)
+        if pool is None:
+            size = limit if limit is not None else self.limit_for(platform)
+            pool = PlatformWorkerPool(platform, size, on_take=self._job_taken)
+            self.pools[platform] = pool
+            logger.info(f"Started {pool.size} worker(s) for {platform}")
+        pool.queue.put_nowait(job)
+
+    async def drain(self):
+        """Wait for every queued job to finish, keeping the workers for more."""
+        await asyncio.gather(*(pool.drain() for pool in list(self.pools.values())))
+
+    async def join(self):
+        """Wait until every queued job has finished."""
+        await asyncio.gather(*(pool.join() for pool in self.pools.values()))
@@ -1,12 +1,32 @@
-import gspread
-from google.oauth2.service_account import Credentials
-from typing import List, Dict, Any
+from typing import List, Dict, Any, AsyncIterator, NamedTuple
+import asyncio
 import os
 import json
+import random
+import threading
+import time
 from .logger import setup_logger
+from .metrics import get_metrics
 
 logger = setup_logger('sheet_service')
 
+class SheetRow(NamedTuple):
+    """One sheet row; values are keyed like settings.json columns ('url', 'status', ...)."""
+    row_num: int
+    values: Dict[str, str]
+
+    def get(self, key: str, default: str = '') -> str:
+        return self.values.get(key, default)
+
+def _is_retryable(error: Exception) -> bool:
+    """False for Sheets API client errors (bad range, no permission, ...) that another flush would repeat."""
+    import gspread
+
+    if isinstance(error, gspread.exceptions.APIError):
+        status = getattr(error.response, 'status_code', None)
+        return not (status and 400 <= status < 500 and status != 429)
+    return True
+
 class GoogleSheetClient:
     def __init__(self, config_path: str):
         """Initialize connection to Google Sheets."""
@@ -14,6 +34,24 @@ class GoogleSheetClient:
         self.client = None
         self.sheet = None
         self.headers = {}
+
+        # Write-behind buffer: (row, col) -> value, latest write wins
+        buffer_cfg = self.config.get('write_buffer', {})
+        self.max_buffered_cells = buffer_cfg.get('max_cells', 500)
+        self.flush_seconds = buffer_cfg.get('flush_seconds', 15)
+        self.max_write_retries = buffer_cfg.get('max_retries', 5)
+        # Flushes a cell may fail before it is dropped from the buffer (the journal still has it)
+        self.max_flush_failures = buffer_cfg.get('max_flush_failures', 3)
+        self._pending = {}
+        # (row, col) -> failed flushes of the value now buffered for that cell
+        self._failures = {}
+        self._pending_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        self.api_calls = 0
+        # Called with the row numbers of each successful flush (e.g. RunJournal.mark_flushed)
+        self.on_flush = None
+        self.read_page_size = self.config.get('read_page_size', 500)
         
     def _load_config(self, path: str) -> dict:
         with open(path, 'r') as f:
@@ -21,6 +59,11 @@ class GoogleSheetClient:
 
     def connect(self):
         """Authenticate and open the spreadsheet."""
+        # gspread and google-auth are imported on connect, so importing this module
+        # (for SheetRow, or a --bookmarks run) stays cheap
+        import gspread
+        from google.oauth2.service_account import Credentials
+
         try:
             creds_file = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 
                                       'config', 'credentials.json')
@@ -54,17 +97,79 @@ class GoogleSheetClient:
             self.connect()
         return self.sheet.get_all_records()
 
+    def _fetch_page(self, start: int, end: int, columns: Dict[str, int]) -> List[SheetRow]:
+        """Read rows start..end of just the configured columns in one batch_get call."""
+        import gspread
+
+        ranges = [f"{gspread.utils.rowcol_to_a1(start, col)}:{gspread.utils.rowcol_to_a1(end, col)}"
+                  for col in columns.values()]
+        self.api_calls += 1
+        with get_metrics().time('read_page', 'sheets'):
+            value_ranges = self.sheet.batch_get(ranges)
+
+        rows = []
+        for offset in range(end - start + 1):
+            values = {}
+            for key, cells in zip(columns, value_ranges):
+                # Trailing blank rows and cells are omitted from the response
+                row = cells[offset] if offset < len(cells) else []
+                values[key] = str(row[0]) if row else ''
+            if any(values.values()):
+                rows.append(SheetRow(start + offset, values))
+        return rows
+
+    async def iter_pages(self, reverse: bool = False) -> AsyncIterator[List[SheetRow]]:
+        """
+        Stream the sheet in pages of read_page_size rows, fetching only the
+        columns listed in settings.json. The next page is fetched while the
+        caller works on the current one. Every page up to the worksheet's
+        row_count is read; fully blank rows (and pages) are left out.
+        reverse=True yields pages from the bottom of the sheet up; rows
+        inside each page stay in sheet order.
+        """
+        if not self.sheet:
+            await asyncio.to_thread(self.connect)
+
+        columns = {key: self.headers[header] for key, header in self.config['columns'].items()
+                   if header in self.headers}
+        last_row = self.sheet.row_count
+        size = self.read_page_size
+        starts = list(range(2, last_row + 1, size))
+        if reverse:
+            starts.reverse()
+
+        def fetch(start):
+            return asyncio.create_task(asyncio.to_thread(
+                self._fetch_page, start, min(start + size - 1, last_row), columns))
+
+        pending = fetch(starts[0]) if starts else None
+        for i in range(len(starts)):
+            page = await pending
+            pending = fetch(starts[i + 1]) if i + 1 < len(starts) else None
+            if not page:
+                # Blank stretches can sit between blocks of rows, so read on to row_count
+                continue
+            yield page
+
+    async def iter_rows(self, reverse: bool = False) -> AsyncIterator[SheetRow]:
+        """Row-at-a-time view of iter_pages()."""
+        async for page in self.iter_pages(reverse):
+            for row in page:
+                yield row
+
     def update_row(self, row_index: int, data: Dict[str, Any]):
         """
-        Update a specific row with new data.
+        Queue an update for a specific row.
         row_index is 2-based (header is 1).
         data keys should match the column names in settings.json.
+        Cells are buffered and sent together by flush(); the buffer flushes
+        itself once it holds max_cells cells or flush_seconds have passed.
         """
         if not self.sheet:
             self.connect()
             
         settings_cols = self.config['columns']
-        updates = []
+        cells = {}
         
         for key, value in data.items():
             # Get the actual sheet header name from config
@@ -76,17 +181,105 @@ class GoogleSheetClient:
                 continue
                 
             if col_header in self.headers:
-                col_idx = self.headers[col_header]
-                updates.append({
-                    'range': gspread.utils.rowcol_to_a1(row_index, col_idx),
-                    'values': [[value]]
-                })
+                cells[(row_index, self.headers[col_header])] = value
             else:
                 logger.warning(f"Column '{col_header}' (for key '{key}') not found in sheet headers")
 
-        if updates:
+        if not cells:
+            return
+
+        with self._pending_lock:
+            self._pending.update(cells)
+            for cell in cells:
+                # A new value starts with a clean slate
+                self._failures.pop(cell, None)
+            pending = len(self._pending)
+        logger.debug(f"Queued row {row_index} with {list(data.keys())} ({pending} cells pending)")
+
+        if pending >= self.max_buffered_cells:
+            self.flush()
+        else:
+            self.flush_if_due()
+
+    def skip_row(self, row_index: int):
+        """Nothing is held per row until it is written; mirrors BookmarkFileClient.skip_row."""
+
+    def flush_if_due(self):
+        """Flush if the buffer has been holding cells for longer than flush_seconds."""
+        if self._pending and time.monotonic() - self._last_flush >= self.flush_seconds:
+            self.flush()
+
+    def flush(self):
+        """Send every buffered cell in a single batch_update call."""
+        import gspread
+
+        # Serialize flushes so an older batch can never land after a newer one
+        with self._flush_lock:
+            with self._pending_lock:
+                pending, self._pending = self._pending, {}
+                self._last_flush = time.monotonic()
+            if not pending:
+                return
+
+            updates = [
+                {'range': gspread.utils.rowcol_to_a1(row, col), 'values': [[value]]}
+                for (row, col), value in sorted(pending.items())
+            ]
+            rows = len({row for row, _ in pending})
             try:
-                self.sheet.batch_update(updates)
-                logger.info(f"Updated row {row_index} with {list(data.keys())}")
+                self._batch_update_with_backoff(updates)
+                logger.info(f"Flushed {len(updates)} cells across {rows} rows")
+                with self._pending_lock:
+                    for cell in pending:
+                        self._failures.pop(cell, None)
+                if self.on_flush:
+                    self.on_flush({row for row, _ in pending})
             except Exception as e:
-                logger.error(f"Failed to batch update row {row_index}: {e}")
+                logger.error(f"Failed to flush {len(updates)} cells across {rows} rows: {e}")
+                self._rebuffer(pending, retryable=_is_retryable(e))
+
+    def _rebuffer(self, pending: Dict[tuple, Any], retryable: bool):
+        """
+        Put the cells of a failed flush back for the next one, unless the error
+        can't go away by itself or a cell has already failed max_flush_failures
+        flushes. Dropped cells stay unflushed in the run journal, so --resume
+        writes them. Cells written again since the flush keep the newer value.
+        """
+        dropped = set()
+        with self._pending_lock:
+            for cell, value in pending.items():
+                if cell in self._pending:
+                    continue
+                failures = self._failures.get(cell, 0) + 1
+                if retryable and failures < self.max_flush_failures:
+                    self._pending[cell] = value
+                    self._failures[cell] = failures
+                else:
+                    self._failures.pop(cell, None)
+                    dropped.add(cell)
+        if dropped:
+            logger.error(f"Gave up on {len(dropped)} cells across {len({row for row, _ in dropped})} rows; "
+                         f"they stay in the run journal for --resume")
+            get_metrics().count('sheets_dropped_cells', retryable=retryable)
+        if len(dropped) < len(pending):
+            logger.warning(f"{len(pending) - len(dropped)} cells will be retried with the next flush")
+
+    def _batch_update_with_backoff(self, updates: List[dict]):
+        import gspread
+
+        delay = 1.0
+        for attempt in range(self.max_write_retries + 1):
+            try:
+                self.api_calls += 1
+                with get_metrics().time('batch_update', 'sheets'):
+                    self.sheet.batch_update(updates)
+                return
+            except gspread.exceptions.APIError as e:
+                status = getattr(e.response, 'status_code', None)
+                if status not in (429, 500, 503) or attempt == self.max_write_retries:
+                    raise
+                wait = delay + random.uniform(0, delay)
+                logger.warning(f"Sheets API returned {status}; retrying batch in {wait:.1f}s")
+                get_metrics().count('sheets_retries', status=status)
+                time.sleep(wait)
+                delay = min(delay * 2, 64)
@@ -0,0 +1,84 @@
+import asyncio
+import os
+import shutil
+import sys
+import zlib
+from .services.journal import RunJournal
+from .services.logger import setup_logger
+
+logger = setup_logger('sharding')
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Chromium refuses to open a profile whose lock files point at another process
+PROFILE_LOCK_FILES = ('SingletonLock', 'SingletonCookie', 'SingletonSocket', 'lockfile')
+
+
+def shard_of(key: str, shard_count: int) -> int:
+    """Stable shard for a video key or row; identical on every host and Python run."""
+    return zlib.crc32(key.encode('utf-8')) % shard_count
+
+
+def shard_path(path: str, shard_index: int) -> str:
+    """data/run_journal.jsonl -> data/run_journal.shard2.jsonl"""
+    root, ext = os.path.splitext(path)
+    return f"{root}.shard{shard_index}{ext}"
+
+
+def prepare_shard_profile(scraping_ops: dict, shard_index: int) -> str:
+    """
+    Give a shard its own browser profile, copied once from the shared one,
+    since two Chromium processes can't open the same profile directory.
+    Returns the user_data_dir setting for the shard.
+    """
+    base = scraping_ops.get('user_data_dir', '../data/browser_context').rstrip('/')
+    shard_dir = f"{base}_shard{shard_index}"
+    source = os.path.join(PROJECT_ROOT, base.replace('../', ''))
+    target = os.path.join(PROJECT_ROOT, shard_dir.replace('../', ''))
+    if not os.path.exists(target) and os.path.exists(source):
+        logger.info(f"Copying browser profile for shard {shard_index} to {target}")
+        shutil.copytree(source, target, ignore=shutil.ignore_patterns(*PROFILE_LOCK_FILES))
+    return shard_dir
+
+
+async def run_workers(worker_count: int, passthrough_args: list) -> list:
+    """Run one scraper process per shard on this machine; returns their exit codes."""
+    processes = []
+    for index in range(worker_count):
+        cmd = [sys.executable, '-m', 'scrapper.main',
+               '--shard-index', str(index), '--shard-count', str(worker_count),
+               '--defer-writes', *passthrough_args]
+        processes.append(await asyncio.create_subprocess_exec(*cmd, cwd=PROJECT_ROOT))
+    logger.info(f"Started {worker_count} shard workers")
+    return await asyncio.gather(*(process.wait() for process in processes))
+
+
+def merge_shard_journals(journal_paths: list, sheet_client) -> int:
+    """
+    Push every shard's unflushed outcomes through one sheet client, so the
+    whole run lands as a few coalesced batch_update calls. Returns rows merged.
+    """
+    journals = [RunJournal(path, resume=True) for path in journal_paths if os.path.exists(path)]
+
+    # Shards own disjoint rows, so each flushed row belongs to exactly one journal
+    def mark_flushed(rows):
+        for journal in journals:
+            owned = [row for row in rows if row in journal.outcomes]
+            if owned:
+                journal.mark_flushed(owned)
+
+    previous_hook = sheet_client.on_flush
+    sheet_client.on_flush = mark_flushed
+    merged = 0
+    try:
+        for journal in journals:
+            for row_num, data in journal.unflushed().items():
+                sheet_client.update_row(row_num, data)
+                merged += 1
+        sheet_client.flush()
+    finally:
+        sheet_client.on_flush = previous_hook
+        for journal in journals:
+            journal.close()
+    logger.info(f"Merged {merged} rows from {len(journals)} shard journals")
+    return merged
@@ -0,0 +1,70 @@
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional
+
+# Format main.py writes into the Last Updated column
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+PRIORITIES = ('sheet', 'newest', 'stalest')
+
+
+def check_priority(priority: str) -> str:
+    """Return priority if it is one of PRIORITIES, else raise ValueError."""
+    if priority not in PRIORITIES:
+        raise ValueError(f"Unknown row priority '{priority}', expected one of {PRIORITIES}")
+    return priority
+
+
+def parse_timestamp(value) -> Optional[datetime]:
+    """Parse a Last Updated cell. Returns None for empty or unreadable values."""
+    if not value:
+        return None
+    try:
+        return datetime.strptime(str(value).strip(), TIMESTAMP_FORMAT)
+    except ValueError:
+        return None
+
+
+def ttl_for(platform: str, ttl_minutes: dict) -> timedelta:
+    """Per-platform freshness TTL, falling back to ttl_minutes['default']."""
+    minutes = ttl_minutes.get(platform, ttl_minutes.get('default', 60))
+    return timedelta(minutes=minutes)
+
+
+def is_fresh(row, ttl: timedelta, now: datetime) -> bool:
+    """
+    True if the row was scraped successfully within the TTL.
+    Failed, never-scraped and stale rows are never fresh.
+    row is a SheetRow (or any mapping keyed by settings.json column keys).
+    """
+    status = str(row.get('status', '')).strip()
+    if status != 'SUCCESS':
+        return False
+    last_updated = parse_timestamp(row.get('last_updated'))
+    if last_updated is None:
+        return False
+    return now - last_updated < ttl
+
+
+def order_rows(rows: Iterable, priority: str = 'sheet') -> List:
+    """
+    Order one page of SheetRows for queueing.
+    - sheet:   top to bottom, as they appear in the sheet
+    - newest:  bottom to top; new posts are appended at the end of the sheet
+               and their counts move fastest (pages are also read bottom-up,
+               see GoogleSheetClient.iter_pages)
+    - stalest: never-scraped and failed rows first, then oldest Last Updated;
+               rows stream in pages, so this ordering holds within each page
+    """
+    rows = list(rows)
+    check_priority(priority)
+    if priority == 'newest':
+        rows.reverse()
+    elif priority == 'stalest':
+        def staleness(row):
+            last_updated = parse_timestamp(row.get('last_updated'))
+            succeeded = str(row.get('status', '')).strip() == 'SUCCESS'
+            if last_updated is None or not succeeded:
+                return (0, datetime.min)
+            return (1, last_updated)
+        rows.sort(key=staleness)
+    return rows
@@ -1,29 +1,234 @@
+import re
+from typing import Dict, Iterable, List, NamedTuple, Optional
 
-def normalize_metric(value: str) -> int:
+# Compact-count suffixes per locale, lowercase and without the trailing dot
+SUFFIXES = {
+    'en': {'k': 10**3, 'thousand': 10**3, 'm': 10**6, 'million': 10**6, 'b': 10**9, 'bn': 10**9, 'billion': 10**9},
+    'es': {'k': 10**3, 'mil': 10**3, 'm': 10**6, 'mill': 10**6, 'millón': 10**6, 'millones': 10**6},
+    'pt': {'k': 10**3, 'mil': 10**3, 'm': 10**6, 'mi': 10**6, 'milhão': 10**6, 'milhões': 10**6, 'bi': 10**9},
+    'fr': {'k': 10**3, 'm': 10**6, 'md': 10**9, 'mrd': 10**9},
+    'de': {'k': 10**3, 'tsd': 10**3, 'm': 10**6, 'mio': 10**6, 'mrd': 10**9},
+    'pl': {'k': 10**3, 'tys': 10**3, 'mln': 10**6, 'mld': 10**9},
+    'ru': {'к': 10**3, 'тыс': 10**3, 'млн': 10**6, 'млрд': 10**9},
+    'tr': {'b': 10**3, 'bin': 10**3, 'mn': 10**6, 'milyon': 10**6, 'mr': 10**9, 'milyar': 10**9},
+    'zh': {'千': 10**3, '万': 10**4, '萬': 10**4, '亿': 10**8, '億': 10**8},
+    'ja': {'千': 10**3, '万': 10**4, '億': 10**8},
+    'ko': {'천': 10**3, '만': 10**4, '억': 10**8},
+    'in': {'k': 10**3, 'l': 10**5, 'lakh': 10**5, 'cr': 10**7, 'crore': 10**7},
+}
+
+# Decimal mark per locale; only consulted when a lone separator is followed by exactly three digits
+DECIMAL_MARKS = {'en': '.', 'zh': '.', 'ja': '.', 'ko': '.', 'in': '.'}
+
+# 'auto' merges every locale whose suffixes don't contradict English ('b' is a thousand in Turkish)
+AUTO_EXCLUDED = ('tr', 'in')
+
+# A standalone number: digits with '.'/',' separators, or space/apostrophe thousands groups,
+# then an optional word (suffix or plain text like 'views') glued on or after whitespace
+NUMBER_RE = re.compile(
+    r"(?<![\w.,])(?P<num>\d+(?:[.,]\d+|[ \u00a0\u202f']\d{3}(?!\d))*)"
+    r"(?P<gap>\s*)(?P<word>[^\W\d_]+\.?)?"
+)
+# The common shape, '1.2M' / '345' / '12 tys.' / '1,2 mil views': one optional decimal mark
+# with one or two digits after it, so no grouping or decimal-mark guessing is needed
+COMPACT_RE = re.compile(r"(\d+)(?:[.,](\d{1,2}))?(\s?)([^\W\d_]*)\.?(?:\s+[^\W\d_]+)*")
+# A bare count grouped in threes with one kind of mark, '4,321' or '1.234.567'; whole in every locale
+GROUPED_RE = re.compile(r"\d{1,3}(?:,\d{3})+|\d{1,3}(?:\.\d{3})+")
+GROUPING_CHARS = str.maketrans('', '', " \u00a0\u202f'")
+MARK_CHARS = str.maketrans('', '', '.,')
+
+# Parsed strings remembered per grammar; counts on a run's pages repeat a lot ('1.2K', '3M', ...)
+CACHE_SIZE = 65536
+
+
+class MetricParse(NamedTuple):
+    """A parsed count, or why it couldn't be parsed (value is None then)."""
+    value: Optional[int]
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.value is not None
+
+
+EMPTY = MetricParse(None, 'empty')
+NO_NUMBER = MetricParse(None, 'no_number')
+
+
+class MetricGrammar:
+    """One locale's compiled rules for reading counts like '1.2M', '1,2 mil', '1.2万' or '12 tys.'."""
+
+    def __init__(self, locale: str):
+        if locale == 'auto':
+            self.suffixes = {}
+            for name, table in SUFFIXES.items():
+                if name not in AUTO_EXCLUDED:
+                    self.suffixes.update(table)
+            self.decimal_mark = None
+        elif locale in SUFFIXES:
+            self.suffixes = dict(SUFFIXES[locale])
+            self.decimal_mark = DECIMAL_MARKS.get(locale, ',')
+        else:
+            raise ValueError(f"Unknown metric locale '{locale}', expected 'auto' or one of {sorted(SUFFIXES)}")
+        self.locale = locale
+        self.longest_suffix = max(len(suffix) for suffix in self.suffixes)
+        self._cache: Dict[str, MetricParse] = {}
+
+    def _multiplier(self, word: str, attached: bool) -> Optional[int]:
+        """Multiplier for the word after a number: 1 for ordinary words, None if it's an unknown glued suffix."""
+        key = word.lower().rstrip('.')
+        if key in self.suffixes:
+            return self.suffixes[key]
+        if attached:
+            # CJK and run-together text: '1.2万次观看', '1.2Kviews'
+            for length in range(min(len(key), self.longest_suffix), 0, -1):
+                if key[:length] in self.suffixes:
+                    return self.suffixes[key[:length]]
+            return None
+        # A separate word such as 'views' or 'likes'
+        return 1
+
+    def _split_decimal(self, number: str, has_multiplier: bool):
+        """(integer digits, fraction digits) after deciding which separator, if any, is the decimal mark."""
+        dots = number.count('.')
+        commas = number.count(',')
+        if not dots and not commas:
+            return number, ''
+        last = max(number.rfind('.'), number.rfind(','))
+        head, mark, tail = number[:last], number[last], number[last + 1:]
+        if dots and commas:
+            # '1.234,5' or '1,234.5': the last kind of mark is the decimal one
+            decimal = True
+        elif dots + commas > 1:
+            # '1.234.567': repeated marks are grouping
+            decimal = False
+        elif len(tail) != 3:
+            decimal = True
+        else:
+            # '1.234' vs '1,234': plain counts are whole numbers, so only a multiplier makes it a fraction
+            decimal = has_multiplier and (self.decimal_mark is None or mark == self.decimal_mark)
+        if decimal:
+            return head.replace('.', '').replace(',', ''), tail
+        return number.replace('.', '').replace(',', ''), ''
+
+    def parse(self, text) -> MetricParse:
+        if text is None:
+            return EMPTY
+        if not isinstance(text, str):
+            text = str(text)
+        result = self._cache.get(text)
+        if result is None:
+            result = self._parse(text)
+            if len(self._cache) >= CACHE_SIZE:
+                self._cache.clear()
+            self._cache[text] = result
+        return result
+
+    def parse_many(self, texts: Iterable) -> Dict[str, MetricParse]:
+        """
+        Parse distinct strings in bulk: {text: MetricParse}, without touching
+        the cache. Plain digits and the compact and grouped shapes skip the
+        general parser; only the rare irregular strings reach it.
+        """
+        fast = self._fast
+        general = self._parse
+        return {text: fast(text) or general(text) for text in texts if isinstance(text, str)}
+
+    def parse_batch(self, values: Iterable) -> List[MetricParse]:
+        """
+        parse() over many values, in input order. Repeated strings are served
+        from the cache, so only the distinct new ones pay for a parse.
+        """
+        values = values if isinstance(values, list) else list(values)
+        cache = self._cache
+        # Set arithmetic finds the distinct strings not parsed yet without a Python-level loop
+        misses = set(values).difference(cache)
+        lookup = cache
+        if misses:
+            fresh = self.parse_many(misses)
+            if len(cache) + len(fresh) > CACHE_SIZE:
+                # Answer this batch from the old entries plus the fresh ones, then start the cache over
+                lookup = {**cache, **fresh}
+                cache.clear()
+            cache.update(fresh)
+        results = list(map(lookup.get, values))
+        if any(not isinstance(value, str) for value in misses):
+            # None and non-string values aren't cached; parse those one at a time
+            results = [result if result is not None else self.parse(value)
+                       for value, result in zip(values, results)]
+        return results
+
+    def clear_cache(self):
+        self._cache.clear()
+
+    def _fast(self, text: str) -> Optional[MetricParse]:
+        """
+        The common shapes: plain digits, compact ('1.2M', '345', '12 tys.',
+        '1,2 mil views': one decimal mark with one or two digits after it) and
+        grouped ('4,321', '1.234.567'). None sends the string to the general parser.
+        """
+        if text.isdigit():
+            return MetricParse(int(text))
+        match = COMPACT_RE.fullmatch(text)
+        if match:
+            whole, fraction, gap, word = match.groups()
+            multiplier = self.suffixes.get(word.lower(), 1 if gap else None) if word else 1
+            if multiplier is None:
+                return None
+            value = int(whole) * multiplier
+            if fraction:
+                value += int(fraction) * multiplier // 10 ** len(fraction)
+            return MetricParse(value)
+        if GROUPED_RE.fullmatch(text):
+            return MetricParse(int(text.translate(MARK_CHARS)))
+        return None
+
+    def _parse(self, text: str) -> MetricParse:
+        text = text.strip()
+        if not text or text in ('N/A', 'n/a'):
+            return EMPTY
+        result = self._fast(text)
+        if result:
+            return result
+
+        match = NUMBER_RE.search(text)
+        if not match:
+            return NO_NUMBER
+        number = match.group('num').translate(GROUPING_CHARS)
+        word = match.group('word')
+        multiplier = 1
+        if word:
+            multiplier = self._multiplier(word, attached=not match.group('gap'))
+            if multiplier is None:
+                return MetricParse(None, f"unknown_suffix:{word}")
+
+        whole, fraction = self._split_decimal(number, multiplier > 1)
+        value = int(whole) * multiplier
+        if fraction:
+            # Integer arithmetic so '1.15M' is 1150000, not 1149999
+            value += int(fraction) * multiplier // 10 ** len(fraction)
+        return MetricParse(value)
+
+
+_grammars: Dict[str, MetricGrammar] = {}
+
+
+def get_grammar(locale: str = 'auto') -> MetricGrammar:
+    """Compiled grammar for a locale, built once per process."""
+    if locale not in _grammars:
+        _grammars[locale] = MetricGrammar(locale)
+    return _grammars[locale]
+
+
+def parse_metric(value, locale: str = 'auto') -> MetricParse:
     """
-    Convert metric strings like '1.2K', '1M', '1,234' to integers.
-    Returns 0 if conversion fails.
+    Parse a displayed count such as '1.2M views', '1,2 mil', '1.2万', '12 tys.' or '1,234'.
+    Returns MetricParse(value) or MetricParse(None, error) - never a silent 0.
     """
-    if not value or value == 'N/A' or value == '':
-        return 0
-        
-    value = str(value).upper().strip()
-    
-    # Remove common non-numeric chars except . and multipliers
-    value = value.replace(',', '').replace('VIEWS', '').replace('LIKES', '').strip()
-    
-    multiplier = 1
-    if 'K' in value:
-        multiplier = 1000
-        value = value.replace('K', '')
-    elif 'M' in value:
-        multiplier = 1000000
-        value = value.replace('M', '')
-    elif 'B' in value:
-        multiplier = 1000000000
-        value = value.replace('B', '')
-        
-    try:
-        return int(float(value) * multiplier)
-    except ValueError:
-        return 0
+    return get_grammar(locale).parse(value)
+
+
+def parse_metrics(values: Iterable, locale: str = 'auto') -> List[MetricParse]:
+    """Batch form of parse_metric, in input order (see MetricGrammar.parse_batch)."""
+    return get_grammar(locale).parse_batch(values)
+
@@ -0,0 +1,124 @@
+import asyncio
+import re
+from typing import Dict, Iterable, NamedTuple, Optional
+from urllib.parse import parse_qs, urlsplit
+from ..services.logger import setup_logger
+
+logger = setup_logger('url_parser')
+
+
+class ParsedURL(NamedTuple):
+    platform: str
+    canonical_url: str
+    video_id: str
+
+
+YOUTUBE_ID_RE = re.compile(r'^[A-Za-z0-9_-]{11}$')
+YOUTUBE_PATH_RE = re.compile(r'^/(?:shorts|embed|live|v)/([^/]+)')
+TIKTOK_PATH_RE = re.compile(r'^/@([^/]+)/video/(\d+)')
+TIKTOK_ALT_PATH_RE = re.compile(r'^/(?:v/(\d+)\.html|embed(?:/v2)?/(\d+))')
+INSTAGRAM_PATH_RE = re.compile(r'^/(?:[^/]+/)?(reels?|p|tv)/([A-Za-z0-9_-]+)')
+
+YOUTUBE_HOSTS = {'youtube.com', 'music.youtube.com', 'youtube-nocookie.com', 'youtu.be'}
+TIKTOK_SHORT_HOSTS = {'vm.tiktok.com', 'vt.tiktok.com'}
+
+
+def _host(parts) -> str:
+    host = (parts.hostname or '').lower()
+    for prefix in ('www.', 'm.'):
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+    return host
+
+
+def _split(url: str):
+    url = url.strip()
+    if '://' not in url:
+        url = 'https://' + url
+    return urlsplit(url)
+
+
+def is_short_link(url: str) -> bool:
+    """Links that only reveal their video ID after a redirect (vm.tiktok.com, /t/, /share/)."""
+    parts = _split(url)
+    host = (parts.hostname or '').lower()
+    if host in TIKTOK_SHORT_HOSTS:
+        return True
+    host = _host(parts)
+    return (host == 'tiktok.com' and parts.path.startswith('/t/')) or \
+           (host == 'instagram.com' and parts.path.startswith('/share/'))
+
+
+def parse_url(url: str) -> Optional[ParsedURL]:
+    """
+    Normalize a video URL to (platform, canonical_url, video_id).
+    Tracking query strings and alternate forms (shorts, youtu.be, /reels/,
+    /user/p/...) all map to the same canonical URL. Returns None for
+    anything that isn't a single supported video.
+    """
+    parts = _split(url)
+    host = _host(parts)
+    path = parts.path
+
+    if host in YOUTUBE_HOSTS:
+        if host == 'youtu.be':
+            video_id = path.strip('/').split('/')[0]
+        elif path == '/watch':
+            video_id = parse_qs(parts.query).get('v', [''])[0]
+        else:
+            match = YOUTUBE_PATH_RE.match(path)
+            video_id = match.group(1) if match else ''
+        if YOUTUBE_ID_RE.match(video_id):
+            return ParsedURL('youtube', f'https://www.youtube.com/watch?v={video_id}', video_id)
+        return None
+
+    if host == 'tiktok.com':
+        match = TIKTOK_PATH_RE.match(path)
+        if match:
+            user, video_id = match.groups()
+            return ParsedURL('tiktok', f'https://www.tiktok.com/@{user}/video/{video_id}', video_id)
+        match = TIKTOK_ALT_PATH_RE.match(path)
+        if match:
+            video_id = match.group(1) or match.group(2)
+            return ParsedURL('tiktok', f'https://m.tiktok.com/v/{video_id}.html', video_id)
+        return None
+
+    if host == 'instagram.com':
+        if path.startswith('/share/'):
+            # Share IDs are not shortcodes; resolve the redirect first
+            return None
+        match = INSTAGRAM_PATH_RE.match(path)
+        if match:
+            kind, shortcode = match.groups()
+            kind = 'reel' if kind == 'reels' else kind
+            return ParsedURL('instagram', f'https://www.instagram.com/{kind}/{shortcode}/', shortcode)
+        return None
+
+    return None
+
+
+async def resolve_short_links(urls: Iterable[str], client, concurrency: int = 10) -> Dict[str, str]:
+    """
+    Follow redirects for short links in bulk with pooled HEAD requests.
+    Returns {short_url: final_url}; links that fail to resolve map to themselves.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def resolve(url):
+        async with semaphore:
+            try:
+                response = await client.head(url, follow_redirects=True)
+                if response.status_code >= 400:
+                    # Some short-link hosts refuse HEAD; a GET still redirects
+                    response = await client.get(url, follow_redirects=True)
+                return url, str(response.url)
+            except Exception as e:
+                logger.warning(f"Could not resolve short link {url}: {e}")
+                return url, url
+
+    unique = set(urls)
+    if not unique:
+        return {}
+    resolved = dict(await asyncio.gather(*(resolve(url) for url in unique)))
+    logger.info(f"Resolved {len(unique)} short links")
+    return resolved
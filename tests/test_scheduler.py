@@ -0,0 +1,53 @@
+import asyncio
+import time
+import unittest
+from scrapper.services.scheduler import RowScheduler
+
+
+class RowSchedulerTest(unittest.IsolatedAsyncioTestCase):
+    async def test_other_platforms_start_while_one_backlog_is_full(self):
+        scheduler = RowScheduler({'instagram': 2, 'youtube': 2})
+        started = {}
+        t0 = time.monotonic()
+
+        def job(platform, n, seconds):
+            async def run():
+                started.setdefault(platform, time.monotonic() - t0)
+                await asyncio.sleep(seconds)
+            return run
+
+        # A single producer, as in ScrapePipeline.submit_page: a long Instagram
+        # backlog (40 jobs on 2 workers, 1 s of work) queued ahead of YouTube rows
+        for n in range(40):
+            await scheduler.submit('instagram', job('instagram', n, 0.05))
+        for n in range(5):
+            await scheduler.submit('youtube', job('youtube', n, 0.01))
+
+        self.assertGreater(scheduler.pools['instagram'].queue.qsize(), 30)
+        await asyncio.sleep(0.1)
+        self.assertIn('youtube', started)
+        self.assertLess(started['youtube'], 0.1)
+        await scheduler.join()
+
+    async def test_wait_for_room_applies_backpressure_across_platforms(self):
+        scheduler = RowScheduler({'instagram': 1}, max_queued=5)
+        gate = asyncio.Event()
+
+        async def blocked():
+            await gate.wait()
+
+        for _ in range(8):
+            await scheduler.submit('instagram', blocked)
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(scheduler.wait_for_room())
+        await asyncio.sleep(0.01)
+        self.assertFalse(waiter.done())
+
+        gate.set()
+        await asyncio.wait_for(waiter, 1)
+        self.assertLess(scheduler.queued, 5)
+        await scheduler.join()
+
+
+if __name__ == '__main__':
+    unittest.main()